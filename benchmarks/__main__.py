@@ -0,0 +1,100 @@
+"""
+Benchmark harness: runs every workload in benchmarks/suite.py and reports ops/sec and
+peak memory as JSON, compared against a stored baseline.
+
+    python -m benchmarks                      # run, print JSON, compare to baseline.json
+    python -m benchmarks --update-baseline    # run and store the results as the new baseline
+    python -m benchmarks --only for_loop --size 5
+
+Exits with status 1 when any workload is slower than the baseline by more than --tolerance.
+"""
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import tracemalloc
+
+from benchmarks.suite import WORKLOADS
+
+BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+
+def measure(workload, size, repeat):
+    ops, run = workload(size)
+    run() # warm-up
+    best = min(_timed(run) for _ in range(repeat))
+    # memory is traced in a separate run since tracemalloc slows execution down
+    tracemalloc.start()
+    run()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "ops": ops,
+        "seconds": round(best, 6),
+        "ops_per_sec": round(ops / best, 1),
+        "peak_kib": round(peak / 1024, 1),
+    }
+
+def _timed(run):
+    start = time.perf_counter()
+    run()
+    return time.perf_counter() - start
+
+def compare(results, baseline, tolerance):
+    # ratio > 1 means faster than the baseline
+    report = {}
+    for name, r in results.items():
+        base = baseline.get("results", {}).get(name)
+        if base is None:
+            continue
+        ratio = r["ops_per_sec"] / base["ops_per_sec"]
+        report[name] = {"speed_ratio": round(ratio, 3), "regression": ratio < 1 - tolerance}
+    return report
+
+def main():
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks",
+        description="Run the interpreter benchmark suite"
+    )
+    parser.add_argument("--only", action="append", choices=sorted(WORKLOADS), help="Run only this workload (repeatable).")
+    parser.add_argument("--size", type=int, default=1, help="Scale factor for every workload.")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per workload; the best is reported.")
+    parser.add_argument("--baseline", default=BASELINE, help="Baseline JSON to compare against.")
+    parser.add_argument("--update-baseline", action="store_true", help="Write the results to the baseline file.")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed slowdown before a regression is reported.")
+    parser.add_argument("--output", help="Also write the JSON report to this file.")
+    args = parser.parse_args()
+
+    names = args.only or list(WORKLOADS)
+    results = {name: measure(WORKLOADS[name], args.size, args.repeat) for name in names}
+    report = {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "size": args.size,
+        "results": results,
+    }
+
+    status = 0
+    if args.update_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, indent=2)
+            f.write("\n")
+    elif os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if baseline.get("size") == args.size:
+            report["comparison"] = compare(results, baseline, args.tolerance)
+            if any(c["regression"] for c in report["comparison"].values()):
+                status = 1
+
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    return status
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,86 @@
+"""
+Micro-benchmark: literal classification of a mixed token stream.
+
+Compares the old try/except PARSERS cascade against parser.classify.
+
+    python -m benchmarks.bench_classify [--tokens N] [--repeat R]
+"""
+import argparse
+import random
+import timeit
+
+from ps_interpreter.core import ParseFailed
+from ps_interpreter.parser import (
+    classify,
+    process_string,
+    process_boolean,
+    process_number,
+    process_code_block,
+    process_name_constant,
+    process_array,
+)
+
+# the cascade parser.process_constants used before classify replaced it
+LEGACY_PARSERS = [
+    process_string,
+    process_boolean,
+    process_number,
+    process_code_block,
+    process_name_constant,
+    process_array
+]
+
+SAMPLE_TOKENS = [
+    "add", "sub", "exch", "dup", "def", "get", "lt", "ifelse",  # operators
+    "x", "counter",                                              # user names
+    "1", "42", "-7", "3.5", "1e3",                               # numbers
+    "/x", "/counter",                                            # literal names
+    "(hello)", "true", "false", "[1 2 3]",                       # other literals
+]
+
+def legacy_classify(token):
+    for parser in LEGACY_PARSERS:
+        try:
+            return parser(token)
+        except ParseFailed:
+            continue
+    return None
+
+def new_classify(token):
+    parser = classify(token)
+    if parser is None:
+        return None
+    return parser(token)
+
+def make_stream(n, seed=0):
+    rng = random.Random(seed)
+    return [rng.choice(SAMPLE_TOKENS) for _ in range(n)]
+
+def bench(fn, stream, repeat):
+    def run():
+        for tok in stream:
+            fn(tok)
+    return min(timeit.repeat(run, number=1, repeat=repeat))
+
+def main():
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.bench_classify",
+        description="Compare the old PARSERS cascade with parser.classify"
+    )
+    parser.add_argument("--tokens", type=int, default=100_000, help="Tokens in the mixed stream.")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per path; the best is reported.")
+    args = parser.parse_args()
+
+    stream = make_stream(args.tokens)
+    # both paths must agree before their timings mean anything
+    assert [legacy_classify(t) for t in SAMPLE_TOKENS] == [new_classify(t) for t in SAMPLE_TOKENS]
+
+    old = bench(legacy_classify, stream, args.repeat)
+    new = bench(new_classify, stream, args.repeat)
+    print(f"{'path':<10}{'seconds':>10}{'tokens/sec':>14}")
+    print(f"{'cascade':<10}{old:>10.4f}{args.tokens / old:>14,.0f}")
+    print(f"{'classify':<10}{new:>10.4f}{args.tokens / new:>14,.0f}")
+    print(f"speedup: {old / new:.2f}x")
+
+if __name__ == "__main__":
+    main()
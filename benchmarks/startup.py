@@ -0,0 +1,66 @@
+"""
+Cold-start benchmark: how long `python -m ps_interpreter program.ps` takes for a trivial
+program, over and above starting Python itself, checked against a budget.
+
+    python -m benchmarks.startup                  # prints JSON, exits 1 over budget
+    python -m benchmarks.startup --budget-ms 20 --runs 30
+
+Bytecode caching is left on for the child processes (even if PYTHONDONTWRITEBYTECODE is
+set here), as in any installed deployment, and the first run of each command only warms
+the cache.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import subprocess
+
+BUDGET_MS = 20.0 # allowed startup overhead on top of a bare `python -c pass`
+PROGRAM = "1 2 add pop\n"
+
+
+def measure(command, runs, env):
+    subprocess.run(command, env=env, stdout=subprocess.DEVNULL, check=True) # warm-up
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(command, env=env, stdout=subprocess.DEVNULL, check=True)
+        timings.append(time.perf_counter() - start)
+    return min(timings) * 1000
+
+def main():
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.startup",
+        description="Measure interpreter cold start against a budget"
+    )
+    parser.add_argument("--runs", type=int, default=20, help="Timed runs per command; the best is reported.")
+    parser.add_argument("--budget-ms", type=float, default=BUDGET_MS, help="Allowed overhead over bare Python.")
+    args = parser.parse_args()
+
+    env = dict(os.environ)
+    env.pop("PYTHONDONTWRITEBYTECODE", None)
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [root, env.get("PYTHONPATH")]))
+    with tempfile.NamedTemporaryFile("w", suffix=".ps", delete=False) as f:
+        f.write(PROGRAM)
+    try:
+        python_ms = measure([sys.executable, "-c", "pass"], args.runs, env)
+        startup_ms = measure([sys.executable, "-m", "ps_interpreter", f.name], args.runs, env)
+    finally:
+        os.unlink(f.name)
+
+    overhead = startup_ms - python_ms
+    report = {
+        "python_ms": round(python_ms, 2),
+        "startup_ms": round(startup_ms, 2),
+        "overhead_ms": round(overhead, 2),
+        "budget_ms": args.budget_ms,
+        "over_budget": overhead > args.budget_ms,
+    }
+    print(json.dumps(report, indent=2))
+    return 1 if report["over_budget"] else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
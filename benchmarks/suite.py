@@ -0,0 +1,85 @@
+"""
+Workloads for the benchmark harness in benchmarks/__main__.py.
+
+Each workload function takes a size factor and returns (ops, run), where run() executes the
+workload once from a fresh interpreter and ops is how many operations one run performs.
+"""
+from ps_interpreter.core import tokenize
+from ps_interpreter.interpreter import Interpreter
+
+
+def _program(source, lexical=False):
+    def run():
+        Interpreter(lexical=lexical).run([source])
+    return run
+
+# countdown that receives itself on the operand stack (n proc), so it recurses in both scoping
+# modes; lexical procedures cannot see their own name because they snapshot the env before def
+_SELF_RECURSIVE = "{ exch dup 0 gt { 1 sub exch dup true exch if } { pop pop } ifelse }"
+_DEPTH = 40 # the depth baseline.json was recorded with
+
+
+def bench_tokenize(size):
+    lines = ["/proc { dup 1 gt { (a (nested) string) 1 sub proc } if } def % comment",
+             "[1 2.5 /name (str)] 42 -7 3.25e2 add sub mul exch"]
+    text = "\n".join(lines * (2500 * size))
+    ops = len(tokenize(text))
+    return ops, lambda: tokenize(text)
+
+def bench_dispatch(size):
+    tokens = ["1", "2", "add", "(s)", "pop", "true", "pop", "/x", "3", "def", "x", "exch", "pop", "pop"]
+    tokens = tokens * (4000 * size)
+    def run():
+        interp = Interpreter()
+        for tok in tokens:
+            interp.process_input(tok)
+    return len(tokens), run
+
+def bench_for_loop(size):
+    n = 100000 * size
+    return n, _program(f"0 1 1 {n} {{ add }} for pop")
+
+def bench_repeat_loop(size):
+    n = 100000 * size
+    return n, _program(f"0 {n} {{ 1 add }} repeat pop")
+
+def _recursion(size, lexical):
+    times = 300 * size
+    source = f"{times} {{ {_DEPTH} {_SELF_RECURSIVE} dup true exch if }} repeat"
+    return times * _DEPTH, _program(source, lexical)
+
+def bench_recursion_dynamic(size):
+    return _recursion(size, lexical=False)
+
+def bench_recursion_lexical(size):
+    return _recursion(size, lexical=True)
+
+def bench_named_recursion(size):
+    times = 300 * size
+    source = f"/down {{ dup 0 gt {{ 1 sub down }} if }} def {times} {{ {_DEPTH} down pop }} repeat"
+    return times * _DEPTH, _program(source)
+
+def bench_strings(size):
+    n = 20000 * size
+    buf = "x" * 1000
+    source = f"/s ({buf}) def {n} {{ s 100 20 getinterval pop s 500 (abcdef) putinterval /s exch def }} repeat"
+    return n, _program(source)
+
+def bench_dictionaries(size):
+    n = 5000 * size
+    source = (f"/x 0 def /d 10 dict def {n} {{ d begin /k 1 def k pop end "
+              f"4 dict begin /y x def /x y 1 add def end /x x 1 add def }} repeat")
+    return n, _program(source)
+
+
+WORKLOADS = {
+    "tokenize": bench_tokenize,
+    "dispatch": bench_dispatch,
+    "for_loop": bench_for_loop,
+    "repeat_loop": bench_repeat_loop,
+    "recursion_dynamic": bench_recursion_dynamic,
+    "recursion_lexical": bench_recursion_lexical,
+    "named_recursion": bench_named_recursion,
+    "strings": bench_strings,
+    "dictionaries": bench_dictionaries,
+}
@@ -1 +1,3 @@
-# moved stuff to main so tests could run better
\ No newline at end of file
+# moved stuff to main so tests could run better
+
+__version__ = "1.0.0"
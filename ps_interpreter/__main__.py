@@ -1,20 +1,192 @@
-import argparse
-import ps_interpreter.core as core
-from .core import repl
+import io
+import sys
+from types import SimpleNamespace
+from .interpreter import Interpreter, MAX_STACK, MAX_DEPTH
 
-def main():
+def run_batch(path, lexical=False, profile=None, trace=False, max_stack=MAX_STACK,
+              max_instructions=None, max_seconds=None, max_depth=MAX_DEPTH, cache=False, autobind=False,
+              opt_level=0, jit=False):
+    # runs a whole file (or stdin for None / "-") without prompts; returns the exit status
+    out = io.StringIO() # all output is buffered and written once at the end
+    interp = _interpreter_class(trace, jit)(lexical=lexical, output=out, max_stack=max_stack,
+                                       max_instructions=max_instructions, max_seconds=max_seconds,
+                                       max_depth=max_depth, autobind=autobind, opt_level=opt_level)
+    profiler = _start_profiler(interp, profile)
+    error = None
+    try:
+        if path is None or path == "-":
+            interp.run(sys.stdin)
+        else:
+            program = _cached_program(path) if cache else None
+            if program is not None:
+                interp.run_compiled(program)
+            else:
+                with open(path, encoding="latin-1") as f:
+                    interp.run(f)
+    except Exception as e: # the first error stops the program
+        error = e
+    sys.stdout.write(out.getvalue())
+    sys.stdout.flush()
+    _report_profile(profiler, profile)
+    if error is not None:
+        _log_error(error)
+        return 1
+    return 0
+
+def _cached_program(path):
+    # the compiled program from the bytecode cache, or None to run the file as a stream: small
+    # files are not worth a lookup, and a program that does not compile must fail where it would
+    # when streamed, after whatever output comes before the error
+    import os
+    from .bytecode import BytecodeCache, MIN_SIZE
+    try:
+        if os.path.getsize(path) < MIN_SIZE:
+            return None
+        with open(path, encoding="latin-1") as f:
+            text = f.read()
+        return BytecodeCache().compile(text)
+    except Exception:
+        return None
+
+def _log_error(error):
+    import logging # imported only when there is something to report
+    logging.basicConfig(level = logging.ERROR)
+    logging.error(error)
+
+def _interpreter_class(trace, jit=False):
+    # tracing wins over the JIT, which would hide the instructions it compiles
+    if not trace:
+        if jit:
+            from .jit import JitInterpreter
+            return JitInterpreter
+        return Interpreter
+    from .trace import TracingInterpreter, enable_trace_output
+    enable_trace_output()
+    return TracingInterpreter
+
+def _start_profiler(interp, profile):
+    if profile is None:
+        return None
+    from .profiler import Profiler
+    profiler = Profiler(interp)
+    profiler.enable()
+    return profiler
+
+def _report_profile(profiler, profile):
+    # the report goes to stderr so it never mixes with program output
+    if profiler is not None:
+        print(profiler.report(profile), file=sys.stderr)
+
+def parse_args(argv):
+    # the plain `python -m ps_interpreter [file]` skips argparse, which takes longer to import
+    # than the whole interpreter
+    if len(argv) <= 1 and all(a == "-" or not a.startswith("-") for a in argv):
+        return SimpleNamespace(lexical=False, file=argv[0] if argv else None, profile=None,
+                               profile_format=None, trace=False,
+                               max_stack=MAX_STACK, max_depth=MAX_DEPTH, max_instructions=None,
+                               max_seconds=None, cache=False, autobind=False, opt_level=0, jit=False)
+    import argparse
     parser = argparse.ArgumentParser(
         prog="python -m ps_interpreter",
-        description="Run the PostScript REPL"
+        description="Run the PostScript REPL, or a PostScript file in batch mode"
     )
     parser.add_argument(
         "--lexical",
         action="store_true",
         help="Use lexical scoping instead of dynamic."
     )
-    args, _ = parser.parse_known_args()
-    core.lexical_scoping = args.lexical
-    repl()
+    parser.add_argument(
+        "file",
+        nargs="?",
+        help="PostScript file to run ('-' for stdin). Piped stdin is also run in batch mode."
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Profile operators and procedures and print a report to stderr at exit."
+    )
+    parser.add_argument(
+        "--profile-format",
+        choices=["table", "json"],
+        help="Format of the profile report (default: table); implies --profile."
+    )
+    parser.add_argument(
+        "--trace",
+        action="store_true",
+        help="Log every instruction and the operand stack to stderr."
+    )
+    parser.add_argument(
+        "--max-stack",
+        type=int,
+        default=MAX_STACK,
+        help=f"Operand stack limit in entries; deeper stacks stop with stackoverflow (default: {MAX_STACK})."
+    )
+    parser.add_argument(
+        "--max-depth",
+        type=int,
+        default=MAX_DEPTH,
+        help=f"Procedure nesting limit; deeper recursion stops with execstackoverflow (default: {MAX_DEPTH})."
+    )
+    parser.add_argument(
+        "--max-instructions",
+        type=int,
+        help="Stop a batch run with an error after about this many instructions."
+    )
+    parser.add_argument(
+        "--max-seconds",
+        type=float,
+        help="Stop a batch run with an error after this many seconds."
+    )
+    parser.add_argument(
+        "--autobind",
+        action="store_true",
+        help="Bind every procedure when it is defined, as if each def were `bind def`."
+    )
+    parser.add_argument(
+        "--opt-level",
+        type=int,
+        choices=[0, 1, 2],
+        default=0,
+        help="1: optimize procedures when they are bound; 2: also bind every procedure at def (default: 0)."
+    )
+    parser.add_argument(
+        "--jit",
+        action="store_true",
+        help="Compile procedures that run often to Python functions."
+    )
+    parser.add_argument(
+        "--cache",
+        action="store_true",
+        help="Keep FILE compiled in an on-disk cache and reuse it on the next run."
+    )
+    args, _ = parser.parse_known_args(argv)
+    # run_batch and the report take the format, or None when not profiling
+    args.profile = args.profile_format or ("table" if args.profile else None)
+    return args
+
+def main():
+    if sys.argv[1:2] == ["batch"]: # python -m ps_interpreter batch DIR_OR_MANIFEST ...
+        from .jobs import main as batch_main
+        sys.exit(batch_main(sys.argv[2:]))
+    if sys.argv[1:2] == ["serve"]: # python -m ps_interpreter serve [--port P | --unix PATH] ...
+        from .server import main as serve_main
+        sys.exit(serve_main(sys.argv[2:]))
+    if sys.argv[1:2] == ["analyze"]: # python -m ps_interpreter analyze FILE
+        from .analysis import main as analyze_main
+        sys.exit(analyze_main(sys.argv[2:]))
+    args = parse_args(sys.argv[1:])
+    if args.file is None and sys.stdin.isatty():
+        interp = _interpreter_class(args.trace, args.jit)(lexical=args.lexical, max_stack=args.max_stack,
+                                                max_depth=args.max_depth, autobind=args.autobind,
+                                                opt_level=args.opt_level)
+        profiler = _start_profiler(interp, args.profile)
+        interp.repl()
+        _report_profile(profiler, args.profile)
+    else:
+        sys.exit(run_batch(args.file, lexical=args.lexical, profile=args.profile, trace=args.trace,
+                           max_stack=args.max_stack, max_instructions=args.max_instructions,
+                           max_seconds=args.max_seconds, max_depth=args.max_depth, cache=args.cache,
+                           autobind=args.autobind, opt_level=args.opt_level, jit=args.jit))
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,295 @@
+"""
+Stack-effect and type inference for bound procedure bodies, run by bind after the peephole
+optimizer at --opt-level 1 and up (Interpreter(opt_level=N)).
+
+specialize() walks a body in the order it runs, keeping a symbolic operand stack of the entries
+it can vouch for. Those are what the body pushed itself, plus whatever an earlier checked
+operator proved was there: once `exch` has run, two operands exist, or the body would have
+stopped with exch's error. Each entry carries the types it can have. Literals and procedures
+know theirs, and results follow from their operands: two integers `add` to an integer, and `gt`
+always makes a boolean. Where an operator is sure to find enough operands of the right types,
+bind swaps in its variant from operations.unchecked:
+
+    { dup mul exch dup mul add sqrt }   add and sqrt drop theirs: exch proved two operands
+    { 0 gt { 1 } if }                   if knows it gets a boolean and a procedure
+
+An instruction whose effect on the stack cannot be known ends what the analysis knows, and
+operators after it are checked as before. That includes a name bind left alone, which may be a
+procedure, and if, repeat and the other operators that run code. It also includes copy and
+clear. A procedure that goes straight to `for` starts knowing its control value is on the stack.
+Fused pairs are left as they are, since their own check is a single test. A body that is bound
+again (`bind bind`, or `bind def` when def binds too) is analyzed from its checked operators, so
+an unchecked variant only stays where the new analysis proves it again.
+
+analyze() gives the inferred stack effect of a body and the stack after each of its instructions.
+`python -m ps_interpreter analyze FILE` prints that for every procedure of a program.
+"""
+import sys
+from ps_interpreter.core import CodeBlock, NumericArray, PSDict, PSString, Name
+from ps_interpreter.parser import PUSH, NAME, PROC, ARRAY, FUSED, OPERATOR
+from ps_interpreter.operations import operations, signatures, unchecked, type_checked
+
+_NAMES = {fn: name for name, fn in operations.items()}
+_NAMES.update((fn, name) for name, fn in unchecked.items())
+_UNCHECKED = set(unchecked.values())
+
+# an entry's types are a tuple of exact classes, or None when nothing is known about them
+INT, REAL, BOOL = (int,), (float,), (bool,)
+_NUMERIC = {int, float, bool}
+
+def _numeric(types):
+    return types is not None and set(types) <= _NUMERIC
+
+def _arithmetic(op1, op2):
+    if not (_numeric(op1) and _numeric(op2)):
+        return None # arrays work element-wise, anything else fails
+    if float not in op1 and float not in op2:
+        return INT
+    return REAL if REAL in (op1, op2) else (int, float)
+
+def _real(op1, op2):
+    return REAL if _numeric(op1) and _numeric(op2) else None
+
+def _same(op):
+    # abs and neg: the operand's type, booleans turned into integers
+    return tuple(dict.fromkeys(int if t is bool else t for t in op)) if _numeric(op) else None
+
+def _logical(*ops):
+    # and, or and not: booleans stay booleans and integers integers
+    if all(op == BOOL for op in ops):
+        return BOOL
+    if all(op is not None and bool not in op for op in ops):
+        return INT
+    return (bool, int)
+
+_COMPARISON = lambda op1, op2: [BOOL]
+_RESULTS = { # operator -> the types of its results, from the types of its operands
+    "exch":      lambda op1, op2: [op2, op1],
+    "pop":       lambda op: [],
+    "dup":       lambda op: [op, op],
+    "count":     lambda: [INT],
+    "add":       lambda op1, op2: [_arithmetic(op1, op2)],
+    "sub":       lambda op1, op2: [_arithmetic(op1, op2)],
+    "mul":       lambda op1, op2: [_arithmetic(op1, op2)],
+    "div":       lambda op1, op2: [_real(op1, op2)],
+    "idiv":      lambda op1, op2: [INT],
+    "mod":       lambda op1, op2: [INT],
+    "abs":       lambda op: [_same(op)],
+    "neg":       lambda op: [_same(op)],
+    "ceiling":   lambda op: [INT if _numeric(op) else None],
+    "floor":     lambda op: [INT if _numeric(op) else None],
+    "round":     lambda op: [INT if _numeric(op) else None],
+    "sqrt":      lambda op: [REAL],
+    "dict":      lambda op: [(PSDict,)],
+    "length":    lambda op: [INT],
+    "maxlength": lambda op: [INT],
+    "string":    lambda op: [(PSString,)],
+    "bind":      lambda op: [op],
+    "eq": _COMPARISON, "ne": _COMPARISON, "ge": _COMPARISON,
+    "gt": _COMPARISON, "le": _COMPARISON, "lt": _COMPARISON,
+    "and":       lambda op1, op2: [_logical(op1, op2)],
+    "or":        lambda op1, op2: [_logical(op1, op2)],
+    "not":       lambda op: [_logical(op)],
+}
+
+def _accepts(types, accepted):
+    return accepted is None or types is not None and all(issubclass(t, accepted) for t in types)
+
+def _counter(init, step):
+    # the type of a for loop's control value
+    if init == INT and step == INT:
+        return INT
+    if init == REAL and _numeric(step):
+        return REAL
+    return None
+
+
+class _State:
+    def __init__(self, entry):
+        self.stack = list(entry) # entries known to be on the stack, bottom first
+        self.inputs = 0 # operands proven to be below the entry, None once the stack is unknown
+        self.forgot = False # set by the instruction that made the stack unknown
+
+    def forget(self):
+        self.stack = []
+        self.inputs = None
+        self.forgot = True
+
+    def take(self, n):
+        # pops n entries; any the body did not push were proven there by the operator that ran
+        stack = self.stack
+        missing = n - len(stack)
+        if missing > 0:
+            stack[:0] = [None] * missing
+            if self.inputs is not None:
+                self.inputs += missing
+        operands = stack[len(stack) - n:]
+        del stack[len(stack) - n:]
+        return operands
+
+    def operator(self, fn):
+        # runs fn symbolically; True when none of its checks can fail
+        name = _NAMES.get(fn)
+        signature = signatures.get(name)
+        if signature is None or signature.pops is None: # not a builtin, or copy and clear
+            self.forget()
+            return False
+        stack, pops = self.stack, signature.pops
+        safe = len(stack) >= pops
+        if safe and name in type_checked:
+            safe = all(map(_accepts, stack[len(stack) - pops:], signature.types))
+        operands = self.take(pops)
+        if signature.pushes is None: # ran a procedure
+            self.forget()
+        elif name in _RESULTS:
+            stack += _RESULTS[name](*operands)
+        else:
+            stack += [None] * signature.pushes
+        return safe
+
+    def instruction(self, instruction):
+        # runs an instruction other than a procedure literal symbolically; True as for operator
+        opcode, operand = instruction
+        if opcode == OPERATOR:
+            return self.operator(operand)
+        if opcode in (PUSH, ARRAY):
+            self.stack.append((type(operand),))
+        elif opcode == FUSED and all(op != NAME for op, _ in operand.fallback):
+            for instruction in operand.fallback: # a bound pair does what its two instructions do
+                self.instruction(instruction)
+        else: # a name, or a pair that still looks its names up
+            self.forget()
+        return False
+
+
+class Step:
+    def __init__(self, instruction, after, unchecked, body=None):
+        self.instruction = instruction # as specialize rewrote it
+        self.after = after # known entries once it has run, or None when the stack is unknown
+        self.unchecked = unchecked
+        self.body = body # the Analysis of a procedure literal
+
+class Analysis:
+    def __init__(self, entry):
+        self.entry = list(entry) # entries the body is known to start with
+        self.steps = []
+        self.inputs = 0 # operands the body takes from below its entry, None if not known
+        self.results = [] # the types it leaves in their place, None if not known
+
+def _walk(instructions, entry=()):
+    # (Analysis, specialized instructions) of a bound body
+    analysis = Analysis(entry)
+    state = _State(entry)
+    out = []
+    for instruction in instructions:
+        opcode, operand = instruction
+        body = None
+        state.forgot = False
+        if opcode == PROC:
+            toks, inner = operand
+            body, inner = _walk(inner)
+            instruction = (PROC, (toks, inner))
+            state.stack.append((CodeBlock,))
+        else:
+            name = _NAMES.get(operand) if opcode == OPERATOR else None
+            if opcode == OPERATOR and operand in _UNCHECKED: # bound again: proven afresh, or checked as before
+                instruction = (OPERATOR, operations[name])
+            before = state.stack[:]
+            safe = state.instruction(instruction)
+            if safe and name in unchecked:
+                instruction = (OPERATOR, unchecked[name])
+                if name == "for" and len(before) >= 4 and out and out[-1][0] == PROC:
+                    # the procedure only runs as this loop's body, after its control value
+                    toks, inner = out[-1][1]
+                    body, inner = _walk(inner, [_counter(before[-4], before[-3])])
+                    out[-1] = (PROC, (toks, inner))
+                    analysis.steps[-1].body = body
+                    body = None
+        out.append(instruction)
+        after = None if state.forgot else state.stack[:]
+        rewritten = opcode == OPERATOR and instruction[1] in _UNCHECKED
+        analysis.steps.append(Step(instruction, after, rewritten, body))
+    if state.inputs is None:
+        analysis.inputs = analysis.results = None
+    else:
+        analysis.inputs, analysis.results = state.inputs, state.stack
+    return analysis, out
+
+def specialize(instructions):
+    # copy of a bound body, nested procedures included, with unchecked operators where it is safe
+    return _walk(instructions)[1]
+
+def analyze(block):
+    # the Analysis of a CodeBlock's body, or of a list of instructions
+    instructions = block.instructions if isinstance(block, CodeBlock) else block
+    return _walk(instructions)[0]
+
+
+# report ----------------------------------------------------------------------------------------------
+_TYPE_NAMES = {int: "int", float: "real", bool: "bool", CodeBlock: "proc", list: "array",
+               NumericArray: "array", PSString: "string", Name: "name", PSDict: "dict"}
+
+def _types(types):
+    if types is None:
+        return "any"
+    return "|".join(dict.fromkeys(_TYPE_NAMES.get(t, t.__name__) for t in types))
+
+def _stack(entries):
+    return "?" if entries is None else " ".join(map(_types, entries))
+
+def effect(analysis):
+    # the stack effect of a body as text: `int any -> real`, or `?` when it cannot be known
+    if analysis.inputs is None:
+        return "?"
+    operands = [None] * analysis.inputs + analysis.entry
+    return " ".join([_stack(operands), "->", _stack(analysis.results)]).strip()
+
+def _describe(instruction):
+    from ps_interpreter.trace import describe
+    if instruction[0] == FUSED: # shown as the pair it stands for
+        return " ".join(map(describe, instruction[1].fallback))
+    return describe(instruction)
+
+def report(analysis, title="procedure", indent=""):
+    # the inferred stack after each instruction, nested procedures indented below their literal
+    lines = [f"{indent}{title}: {effect(analysis)}"]
+    for step in analysis.steps:
+        line = f"{indent}  {_describe(step.instruction):<24} {_stack(step.after):<24}"
+        lines.append((line + (" unchecked" if step.unchecked else "")).rstrip())
+        if step.body is not None:
+            lines.append(report(step.body, _describe(step.instruction), indent + "    "))
+    return "\n".join(lines)
+
+def analyze_program(text, lexical=False):
+    # (name, Analysis) for each top-level procedure of a program, bound as `bind` would bind it
+    # against the operators alone and optimized as at --opt-level 1
+    from ps_interpreter.interpreter import Interpreter
+    from ps_interpreter.operations import bind_instructions
+    from ps_interpreter.peephole import optimize
+    from ps_interpreter.bytecode import compile_program
+    interp = Interpreter(lexical=lexical)
+    analyses = []
+    previous = None
+    for instruction in compile_program(text):
+        if instruction[0] == PROC:
+            instructions = optimize(bind_instructions(interp, [instruction]), inline=not lexical)
+            analysis = _walk(instructions)[0].steps[0].body
+            named = previous is not None and previous[0] == PUSH and type(previous[1]) is Name
+            analyses.append((repr(previous[1]) if named else _describe(instruction), analysis))
+        previous = instruction
+    return analyses
+
+def main(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser(
+        prog="python -m ps_interpreter analyze",
+        description="Print the inferred stack effects of every procedure in a PostScript file"
+    )
+    parser.add_argument("file", help="PostScript file to analyze; nothing in it is run.")
+    parser.add_argument("--lexical", action="store_true", help="Use lexical scoping instead of dynamic.")
+    args = parser.parse_args(argv)
+    with open(args.file, encoding="latin-1") as f:
+        text = f.read()
+    for title, analysis in analyze_program(text, args.lexical):
+        sys.stdout.write(report(analysis, title) + "\n")
+    return 0
@@ -0,0 +1,204 @@
+"""
+On-disk cache of compiled programs, so a program that runs over and over is tokenized and
+compiled once.
+
+Entries are keyed by a hash of the program plus a hash of the interpreter's own source and the
+Python version (the form is written with marshal), so editing or upgrading the interpreter
+can never load an entry compiled by the old code. The cache is opt-in (--cache), and the
+cache directory is
+kept under max_bytes by deleting the least recently used entries; a hit refreshes an entry.
+Programs smaller than MIN_SIZE are not cached at all: they compile faster than the cache
+can be looked up.
+"""
+import gc
+import array
+import os
+import sys
+import marshal
+from ps_interpreter.core import CodeBlock, Name, NumericArray, PSString, tokenize
+from ps_interpreter.parser import compile_tokens, compile_value, PUSH, NAME, PROC, ARRAY, FUSED
+import ps_interpreter.operations as operations
+
+MIN_SIZE = 4096 # bytes of source
+MAX_BYTES = 64 * 1024 * 1024
+_NUMERIC = -1 # ARRAY holding a NumericArray, stored as typecode and raw bytes
+_STRING = -2  # ARRAY holding a PSString, stored as bytes
+_LITERAL = -3 # PUSH of a literal name; names are stored as their text
+_LIST = -4    # ARRAY holding a list, its elements stored as the instructions that make them
+
+_source_hash = None
+
+def source_hash():
+    # hash of every module of the package, computed once per process
+    global _source_hash
+    if _source_hash is None:
+        import hashlib
+        digest = hashlib.sha256()
+        package = os.path.dirname(os.path.abspath(__file__))
+        for name in sorted(os.listdir(package)):
+            if name.endswith(".py"):
+                with open(os.path.join(package, name), "rb") as f:
+                    digest.update(name.encode() + b"\0" + f.read())
+        _source_hash = digest.hexdigest()
+    return _source_hash
+
+def default_directory():
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.environ.get("PS_INTERPRETER_CACHE") or os.path.join(base, "ps_interpreter")
+
+
+# compiled form ---------------------------------------------------------------------------------------
+def compile_program(text):
+    # the top-level instructions of a whole program; anything after a top-level quit is dropped,
+    # just as Interpreter.run never reads past it
+    tokens = tokenize(text)
+    if "quit" in tokens:
+        tokens = tokens[:tokens.index("quit")]
+    return compile_tokens(tokens)
+
+def _element(value):
+    # an array element as the instruction that would make it again
+    if type(value) is CodeBlock:
+        return (PROC, (value.tokens, value.instructions))
+    return compile_value(value)
+
+def encode(instructions):
+    # instructions -> nested tuples marshal can write
+    out = []
+    for opcode, operand in instructions:
+        if opcode == PROC:
+            toks, body = operand
+            out.append((PROC, toks, encode(body)))
+        elif opcode == FUSED:
+            out.append((FUSED, encode(operand.fallback)))
+        elif opcode == ARRAY and type(operand) is NumericArray:
+            out.append((_NUMERIC, operand.data.typecode, operand.data.tobytes()))
+        elif opcode == NAME:
+            out.append((NAME, operand.text))
+        elif opcode == PUSH and type(operand) is Name:
+            out.append((_LITERAL, operand.text))
+        elif opcode == ARRAY and type(operand) is PSString:
+            out.append((_STRING, bytes(operand.data)))
+        elif opcode == ARRAY and type(operand) is list:
+            out.append((_LIST, encode(map(_element, operand))))
+        else:
+            out.append((opcode, operand))
+    return out
+
+def decode(data):
+    instructions = []
+    for entry in data:
+        opcode = entry[0]
+        if opcode == PROC:
+            instructions.append((PROC, (entry[1], decode(entry[2]))))
+        elif opcode == FUSED:
+            first, second = decode(entry[1])
+            fused = operations.superinstruction(first, second)
+            instructions.extend([(FUSED, fused)] if fused is not None else [first, second])
+        elif opcode == _NUMERIC:
+            instructions.append((ARRAY, NumericArray(array.array(entry[1], entry[2]))))
+        elif opcode == NAME:
+            instructions.append((NAME, Name.of(entry[1])))
+        elif opcode == _LITERAL:
+            instructions.append((PUSH, Name.of(entry[1], executable=False)))
+        elif opcode == _STRING:
+            instructions.append((ARRAY, PSString(bytearray(entry[1]))))
+        elif opcode == _LIST:
+            elements = [CodeBlock(operand[0], None, operand[1]) if opcode == PROC else operand
+                        for opcode, operand in decode(entry[1])]
+            instructions.append((ARRAY, elements))
+        else:
+            instructions.append((opcode, entry[1]))
+    return instructions
+
+
+# cache -----------------------------------------------------------------------------------------------
+class BytecodeCache:
+    def __init__(self, directory=None, max_bytes=MAX_BYTES):
+        self.directory = directory or default_directory()
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, text):
+        import hashlib # only paid for programs big enough to cache
+        tag = f"{source_hash()}:{sys.implementation.cache_tag}:"
+        return hashlib.sha256((tag + text).encode("utf-8", "surrogatepass")).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + ".psc")
+
+    def load(self, key):
+        # the cached instructions, or None
+        path = self._path(key)
+        enabled = gc.isenabled()
+        gc.disable() # decoding allocates only acyclic objects, and collections would double its time
+        try:
+            with open(path, "rb") as f:
+                instructions = decode(marshal.loads(f.read()))
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, EOFError, TypeError, IndexError):
+            self._remove(path) # unreadable or corrupt entry
+            return None
+        finally:
+            if enabled:
+                gc.enable()
+        try:
+            os.utime(path) # most recently used
+        except OSError:
+            pass
+        return instructions
+
+    def store(self, key, instructions):
+        # writes atomically, then trims the directory; a cache that cannot be written is ignored
+        path = self._path(key)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(tmp, "wb") as f:
+                f.write(marshal.dumps(encode(instructions)))
+            os.replace(tmp, path)
+        except OSError:
+            self._remove(tmp)
+            return
+        self.evict()
+
+    def evict(self):
+        # deletes least recently used entries until the directory fits in max_bytes
+        entries = []
+        try:
+            with os.scandir(self.directory) as it:
+                for entry in it:
+                    if entry.name.endswith(".psc"):
+                        st = entry.stat()
+                        entries.append((st.st_mtime, st.st_size, entry.path))
+        except OSError:
+            return
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            self._remove(path)
+            total -= size
+
+    def compile(self, text):
+        # cached instructions for the program text, compiling and storing them on a miss
+        if len(text) < MIN_SIZE:
+            return compile_program(text)
+        key = self.key(text)
+        instructions = self.load(key)
+        if instructions is not None:
+            self.hits += 1
+            return instructions
+        self.misses += 1
+        instructions = compile_program(text)
+        self.store(key, instructions)
+        return instructions
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
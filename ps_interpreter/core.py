@@ -1,24 +1,243 @@
 import re
-import logging
+import array
+import weakref
+import operator
+from itertools import repeat
 
-logging.basicConfig(level = logging.ERROR)
-
-lexical_scoping = False
+def copy_literal(value):
+    # a fresh copy of an array or string literal, strings and arrays inside an array included
+    if type(value) is list:
+        return [copy_literal(v) if isinstance(v, (list, PSString, NumericArray)) else v for v in value]
+    return value.copy()
 
 class PSDict(dict):
     def __init__(self, capacity):
         super().__init__()
         self.maxlength = capacity
 
+class EnvDict(dict):
+    """
+    Dictionary owned by the interpreter rather than the program: systemdict, userdict and
+    lexical snapshots. Once captured by a lexical CodeBlock it is shared, and the interpreter
+    copies it before the next write instead of copying it at every capture and call.
+    """
+    shared = False
+
+class NumericArray:
+    """
+    PostScript array whose elements are all integers or all reals, stored unboxed in an
+    array.array: typecode 'q' for integers, 'd' for reals. add, sub, mul and div work element-wise
+    on it, against another array of the same length or against a single number. A store that does
+    not fit the typecode (a real among integers, a name among numbers) turns the storage into a
+    list in place, so every reference to the array sees it and no element changes type.
+    """
+    __slots__ = ("data",)
+
+    def __init__(self, data):
+        self.data = data # array.array, or a list once a store did not fit it
+
+    @classmethod
+    def of(cls, values):
+        # the PostScript array for values: unboxed when they are all integers that fit 64 bits or
+        # all reals, a plain list otherwise
+        values = list(values)
+        kinds = set(map(type, values))
+        if kinds == {float}:
+            return cls(array.array("d", values))
+        if kinds == {int}:
+            try:
+                return cls(array.array("q", values))
+            except OverflowError:
+                pass
+        return values
+
+    def copy(self):
+        return NumericArray(self.data[:])
+
+    def __len__(self):
+        return len(self.data)
+
+    def __iter__(self):
+        return iter(self.data)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice): # getinterval: still an array, copied as array slices are
+            return NumericArray(self.data[index])
+        return self.data[index]
+
+    def __setitem__(self, index, values):
+        # putinterval's store into a slice
+        values = list(values)
+        data = self.data
+        if type(data) is array.array:
+            kind = int if data.typecode == "q" else float
+            if all(type(v) is kind for v in values):
+                try:
+                    data[index] = array.array(data.typecode, values)
+                    return
+                except OverflowError:
+                    pass
+            data = self.data = data.tolist()
+        data[index] = values
+
+    def __eq__(self, other):
+        if isinstance(other, NumericArray):
+            return list(self.data) == list(other.data)
+        return NotImplemented
+
+    __hash__ = None # mutable
+
+    def __repr__(self):
+        return "[" + " ".join(map(str, self.data)) + "]"
+
+    def _elementwise(self, fn, other, reflected=False):
+        if isinstance(other, (list, NumericArray)):
+            if len(other) != len(self):
+                raise ValueError("Arrays must have the same length.")
+        elif isinstance(other, (int, float)):
+            other = repeat(other)
+        else:
+            return NotImplemented
+        values = map(fn, other, self.data) if reflected else map(fn, self.data, other)
+        try:
+            return NumericArray.of(values)
+        except ZeroDivisionError:
+            raise ValueError("Division by zero.") from None
+
+    def __add__(self, other):      return self._elementwise(operator.add, other)
+    def __radd__(self, other):     return self._elementwise(operator.add, other, True)
+    def __sub__(self, other):      return self._elementwise(operator.sub, other)
+    def __rsub__(self, other):     return self._elementwise(operator.sub, other, True)
+    def __mul__(self, other):      return self._elementwise(operator.mul, other)
+    def __rmul__(self, other):     return self._elementwise(operator.mul, other, True)
+    def __truediv__(self, other):  return self._elementwise(operator.truediv, other)
+    def __rtruediv__(self, other): return self._elementwise(operator.truediv, other, True)
+
+class PSString:
+    """
+    PostScript string: a fixed-length, mutable run of bytes (characters are latin-1, the
+    encoding programs are read in). putinterval writes into it in place, and getinterval returns
+    a PSString over a memoryview of the same bytes, so a write through either one shows in both.
+    """
+    __slots__ = ("data",)
+
+    def __init__(self, data):
+        self.data = data # bytearray, or a memoryview into another string's bytes
+
+    @classmethod
+    def of(cls, text):
+        return cls(bytearray(text.encode("latin-1", "replace")))
+
+    def copy(self):
+        return PSString(bytearray(self.data))
+
+    def interval(self, index, count):
+        return PSString(memoryview(self.data)[index:index + count])
+
+    def put(self, index, source):
+        self.data[index:index + len(source.data)] = source.data
+
+    def __len__(self):
+        return len(self.data)
+
+    def __getitem__(self, index):
+        return self.data[index] # the character code, as PostScript get returns
+
+    def __str__(self):
+        return str(self.data, "latin-1")
+
+    def __repr__(self):
+        return f"({self})"
+
+    # compared by content, with each other, with Python strings and with names by their text
+    def __eq__(self, other):
+        if isinstance(other, PSString):
+            return self.data == other.data
+        if isinstance(other, str):
+            return str(self) == other
+        if isinstance(other, Name):
+            return str(self) == other.text
+        return NotImplemented
+
+    __hash__ = None # mutable
+
+    def _compare(self, fn, other):
+        if not isinstance(other, PSString):
+            return NotImplemented
+        return fn(bytes(self.data), bytes(other.data))
+
+    def __lt__(self, other): return self._compare(operator.lt, other)
+    def __le__(self, other): return self._compare(operator.le, other)
+    def __gt__(self, other): return self._compare(operator.gt, other)
+    def __ge__(self, other): return self._compare(operator.ge, other)
+
+class Name:
+    """
+    PostScript name, interned when a program is compiled: there is one executable (`x`) and one
+    literal (`/x`) Name per text, so names hash and compare by identity. Dictionaries are keyed
+    by the executable flavour, which every Name points to as `key`. The intern tables hold their
+    Names weakly, so a name no program, dictionary or cache refers to any more is dropped.
+    eq compares a name with a string by text, as PostScript does: `/a (a) eq` is true.
+    """
+    __slots__ = ("text", "executable", "key", "__weakref__")
+    _executable = weakref.WeakValueDictionary() # text -> Name
+    _literal = weakref.WeakValueDictionary()
+
+    def __init__(self, text, executable, key=None):
+        self.text = text
+        self.executable = executable
+        self.key = self if key is None else key
+
+    @classmethod
+    def of(cls, text, executable=True):
+        # the interned Name for text
+        table = cls._executable if executable else cls._literal
+        name = table.get(text)
+        if name is None:
+            key = None if executable else cls.of(text)
+            name = table.setdefault(text, cls(text, executable, key))
+        return name
+
+    def __reduce__(self): # unpickles to the interned Name
+        return (Name.of, (self.text, self.executable))
+
+    def __str__(self):
+        return self.text
+
+    def __repr__(self):
+        return self.text if self.executable else "/" + self.text
+
 class CodeBlock:
-    def __init__(self, tokens, env):
+    calls = 0     # calls and loop iterations so far, counted by jit.JitInterpreter only
+    native = None # compiled Python function from the JIT, or False if the body cannot be compiled
+
+    def __init__(self, tokens, env, instructions=None):
         self.tokens = tokens
-        # shallow‐copy each dict so subsequent changes to the global stack won’t bleed in
-        self.env = [d.copy() for d in env]
+        self.name = None # set by the first def that binds it, for profiles and error reports
+        # body compiled once by the parser, run directly by Interpreter.execute
+        if instructions is None:
+            from ps_interpreter.parser import compile_tokens
+            instructions = compile_tokens(tokens)
+        self.instructions = instructions
+        # dictionary environment from Interpreter.capture_env in lexical mode, None in dynamic mode
+        self.env = env
+        self.name_cache = {} # names resolved against env, reused across lexical calls
 
+    def __repr__(self):
+        return "{" + " ".join(self.tokens) + "}"
+
+# stacks of the default interpreter, used by the module-level process_input, run and repl
 op_stack = [] # operand stack
 dict_stack = [] # dictionary stack
-dict_stack.append({})
+_default_interpreter = None
+
+def default_interpreter():
+    # created on first use so that importing core never pulls in the operators
+    global _default_interpreter
+    if _default_interpreter is None:
+        from ps_interpreter.interpreter import Interpreter
+        _default_interpreter = Interpreter(op_stack=op_stack, dict_stack=dict_stack)
+    return _default_interpreter
 
 class ParseFailed(Exception):
     """ Exception while parsing """
@@ -35,44 +254,167 @@ class StackUnderflow(Exception):
     def __init__(self, message):
         super().__init__(message)
 
+class BudgetExceeded(Exception):
+    """ Exception when a program runs out of its instruction or time budget """
+    def __init__(self, message):
+        super().__init__(message)
 
-# repl and input processing ------------------------------------------------------------------------------------
-from ps_interpreter.parser import process_input
+class StackOverflow(Exception):
+    """ Exception when the operand stack grows past its limit (PostScript stackoverflow) """
+    def __init__(self, message):
+        super().__init__(message)
 
-# regex
-_TOKEN_RE = re.compile(
-    r'%.*$|'         #  1) comments       → '%...' to end-of-line
-    r'\([^)]*\)|'    #  2) strings        → '( ... )'
-    r'\{[^}]*\}|'    #  3) code blocks    → '{ ... }'
-    r'\[[^\]]*\]|'   #  4) arrays         → '\[ ... \]'
-    r'[^\s]+'        #  5) bare tokens    → sequences of non-whitespace characters
-)
 
-def tokenize(line):
-    tokens = []
-    for m in _TOKEN_RE.finditer(line): # walks through the line in order and groups based on the regex
-        tok = m.group(0) # pulls out the grouped text from the regex
-        if tok.startswith('%'): # handles comments
-            break
-        tokens.append(tok) # adds a token to the list
-        logging.debug(f"Token: {tok}")
-    return tokens # returns the list of tokens
+# tokenizing and input processing -------------------------------------------------------------------------------
+# tokenizer
+CHUNK_SIZE = 64 * 1024 # characters read per call when tokenizing a file-like object
 
-def repl():
-    # prompt changes based on the scoping mode
-    prompt = "lexical REPL> " if lexical_scoping else "REPL> "
-    while True:
-        line = input(prompt) # reads in the user entered line
-        if line.lower() == "quit": # checks for user trying to exit
-            break
-        for tok in tokenize(line): # loops through the list of tokens produced by tokenize
-            process_input(tok) # sends the token to the parser
-        logging.debug(f"Operand Stack: {op_stack}")
+_SPACE_RE  = re.compile(r'\s+')
+_EOL_RE    = re.compile(r'[\r\n]')
+_BARE_RE   = re.compile(r'/?[^\s(){}\[\]%/]*')   # names, numbers and literal names
+_REST_RE   = re.compile(r'[^\s(){}\[\]%/]*')     # the rest of a bare token split across chunks
+_STRING_RE = re.compile(r'[()\\]')              # characters that matter inside a string
+_NESTED_RE = re.compile(r'[(){}\[\]%]')          # characters that matter inside a procedure or array
 
+_OPENERS = "({["
+_CLOSERS = ")}]"
 
+class Tokenizer:
+    """
+    Incremental tokenizer. feed() takes text in arbitrary chunks and yields every token
+    completed so far; strings, procedures and arrays may nest and span chunk boundaries.
+    """
+    def __init__(self):
+        self._buf = []          # pieces of the token being built
+        self._open = []         # unclosed '(' '{' '[' of the current token
+        self._comment = False   # skipping a comment up to the end of the line
+        self._escape = False    # the previous chunk ended inside a string on a backslash
 
+    @property
+    def depth(self):
+        return len(self._open)
 
-# import operators
-import ps_interpreter.operations
+    def feed(self, chunk):
+        pos = 0
+        end = len(chunk)
+        buf = self._buf
+        opened = self._open
+        while pos < end:
+            if self._comment:
+                m = _EOL_RE.search(chunk, pos)
+                if m is None:
+                    return
+                self._comment = False
+                pos = m.start() # the newline still separates tokens
+            elif opened and opened[-1] == "(":
+                if self._escape:
+                    buf.append(chunk[pos])
+                    self._escape = False
+                    pos += 1
+                    continue
+                m = _STRING_RE.search(chunk, pos)
+                if m is None:
+                    buf.append(chunk[pos:])
+                    return
+                c = m.group()
+                if c == "\\":
+                    buf.append(chunk[pos:m.end()])
+                    self._escape = True
+                    pos = m.end()
+                    continue
+                buf.append(chunk[pos:m.end()])
+                pos = m.end()
+                if c == "(":
+                    opened.append(c)
+                else:
+                    opened.pop()
+                    if not opened:
+                        yield self._take()
+            elif opened:
+                m = _NESTED_RE.search(chunk, pos)
+                if m is None:
+                    buf.append(chunk[pos:])
+                    return
+                c = m.group()
+                buf.append(chunk[pos:m.start()])
+                pos = m.end()
+                if c == "%":
+                    self._comment = True
+                    continue
+                buf.append(c)
+                if c in _OPENERS:
+                    opened.append(c)
+                else:
+                    opened.pop()
+                    if not opened:
+                        yield self._take()
+            elif buf:
+                # a bare token that ran to the end of the previous chunk
+                m = _REST_RE.match(chunk, pos)
+                buf.append(m.group())
+                pos = m.end()
+                if pos < end:
+                    yield self._take()
+            else:
+                c = chunk[pos]
+                if c.isspace():
+                    pos = _SPACE_RE.match(chunk, pos).end()
+                elif c == "%":
+                    self._comment = True
+                elif c in _OPENERS:
+                    opened.append(c)
+                    buf.append(c)
+                    pos += 1
+                elif c in _CLOSERS:
+                    # unmatched closer, left for the parser to reject
+                    yield c
+                    pos += 1
+                else:
+                    m = _BARE_RE.match(chunk, pos)
+                    pos = m.end()
+                    if pos < end:
+                        yield m.group()
+                    else:
+                        buf.append(m.group())
 
-# entry point is now handled by __init__.py
\ No newline at end of file
+    def close(self):
+        if self._open:
+            kind = {"(": "string", "{": "code block", "[": "array"}[self._open[0]]
+            self._buf.clear()
+            self._open.clear()
+            raise ParseFailed(f"Unterminated {kind}.")
+        self._comment = False
+        if self._buf:
+            yield self._take()
+
+    def _take(self):
+        tok = "".join(self._buf)
+        self._buf.clear()
+        return tok
+
+def _chunks(source):
+    read = getattr(source, "read", None)
+    if read is None:
+        yield from source # any iterable of text chunks, e.g. a list or generator
+        return
+    while True:
+        chunk = read(CHUNK_SIZE)
+        if not chunk:
+            return
+        yield chunk
+
+def iter_tokens(source):
+    # lazily tokenizes a file-like object or an iterable of text chunks
+    tokenizer = Tokenizer()
+    for chunk in _chunks(source):
+        yield from tokenizer.feed(chunk)
+    yield from tokenizer.close()
+
+def tokenize(line):
+    return list(iter_tokens([line])) # returns the list of tokens
+
+def run(source):
+    default_interpreter().run(source)
+
+def repl():
+    default_interpreter().repl()
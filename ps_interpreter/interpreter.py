@@ -0,0 +1,318 @@
+import time
+from ps_interpreter.core import CodeBlock, EnvDict, copy_literal, Name, ParseFailed, StackOverflow, BudgetExceeded, Tokenizer, iter_tokens
+from ps_interpreter.parser import compile_token, PUSH, NAME, PROC, FUSED, CALL, OPERATOR
+from ps_interpreter.operations import operations
+
+_MISSING = object()
+
+def systemdict(operators):
+    # the operator table keyed by Name, as every dictionary is
+    return EnvDict((Name.of(name), fn) for name, fn in operators.items())
+
+# systemdict of the builtin operators, built once and shared by every interpreter; the program
+# never writes to it (def goes to the top dict and end keeps userdict), and it is marked shared
+# so anything that must change it copies it first
+SYSTEMDICT = systemdict(operations)
+SYSTEMDICT.shared = True
+MAX_STACK = 1000000 # default operand stack limit, in entries
+MAX_DEPTH = 100000 # default execution stack limit (procedure nesting), in frames
+CHECK_INTERVAL = 1000 # instructions between budget checks
+
+class Interpreter:
+    """
+    One PostScript machine: operand stack, dictionary stack, scoping mode, operator table
+    and output stream. Operators receive the interpreter they run in, so any number of
+    interpreters can live side by side in one process.
+    """
+    def __init__(self, lexical=False, output=None, op_stack=None, dict_stack=None, max_stack=MAX_STACK,
+                 max_instructions=None, max_seconds=None, max_depth=MAX_DEPTH, autobind=False, opt_level=0):
+        self.lexical_scoping = lexical
+        # 1: bind also runs the peephole optimizer over what it binds; 2: and def binds everything
+        self.opt_level = opt_level
+        self.autobind = autobind or opt_level >= 2 # def binds every procedure it stores, as `bind def` would
+        self.output = output # stream print, = and == write to; None means sys.stdout
+        self.max_stack = max_stack # operand stack limit, None for unbounded
+        self.max_instructions = max_instructions # instruction budget per run, None for unbounded
+        self.max_seconds = max_seconds # wall-clock budget per run, None for unbounded
+        self.max_depth = max_depth # execution stack limit, None for unbounded
+        self.check_interval = CHECK_INTERVAL
+        self.execution = None # the slices.Execution driving this interpreter, if any
+        self.pausing = False # set by that Execution when its slice is used up
+        self.operators = operations # shared: replaced (by the profiler), never changed in place
+        # existing lists may be adopted, which is how core.op_stack / core.dict_stack stay live
+        self.op_stack = [] if op_stack is None else op_stack
+        self.dict_stack = [] if dict_stack is None else dict_stack
+        self.reset()
+
+    def reset(self):
+        # empties the operand stack and starts over with systemdict (operators) and an empty userdict;
+        # the stack lists themselves are kept, so adopted lists and references to them stay valid
+        self.op_stack.clear()
+        self.exec_stack = [] # frames of the procedures being run, innermost last
+        self.peak_depth = 0 # deepest operand stack seen at a checkpoint
+        self.start_budget()
+        operators = SYSTEMDICT if self.operators is operations else systemdict(self.operators)
+        self.dict_stack[:] = [operators, EnvDict()]
+        # name -> resolved value; def drops one name, begin/end and env swaps drop everything
+        self.name_cache = {}
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self._stack_changes = 0  # defs, begins and ends so far
+        self._visible_writes = 0 # defs into dicts the program can reach from begin
+
+    # dictionary environment ---------------------------------------------------------------------------
+    def capture_env(self):
+        # O(depth): the interpreter's own dicts are shared copy-on-write,
+        # dicts the program can still reach (from begin) are snapshotted as before
+        env = []
+        for d in self.dict_stack:
+            if type(d) is not EnvDict:
+                d = EnvDict(d)
+            d.shared = True
+            env.append(d)
+        return tuple(env)
+
+    def current_dict(self):
+        # top of the dictionary stack, copied first if a lexical CodeBlock still shares it
+        d = self.dict_stack[-1]
+        if type(d) is EnvDict and d.shared:
+            d = self.dict_stack[-1] = EnvDict(d)
+        return d
+
+    def define(self, key, value):
+        # key is an executable Name (Name.key)
+        if type(value) is CodeBlock and value.name is None:
+            value.name = key.text
+        d = self.current_dict()
+        d[key] = value
+        self.name_cache.pop(key, None)
+        self._stack_changes += 1
+        if type(d) is not EnvDict:
+            self._visible_writes += 1
+
+    def invalidate_names(self):
+        # begin or end changed which dictionaries are searched
+        self.name_cache.clear()
+        self._stack_changes += 1
+
+    # limits -------------------------------------------------------------------------------------------
+    # Checked where a program can keep going: every top-level token, every procedure call and
+    # loop iteration, and before copy. The execution stack depth is checked with the budgets.
+    # Each call counts its body against a countdown, and callers only call checkpoint() once the
+    # countdown runs out or the stack passes peak_depth, so the common case costs a subtraction
+    # and two comparisons.
+    @property
+    def stack_depth(self):
+        return len(self.op_stack)
+
+    def check_stack(self, extra=0):
+        # records a new peak depth, or raises StackOverflow if it would pass max_stack
+        depth = len(self.op_stack) + extra
+        if depth > self.peak_depth:
+            if self.max_stack is not None and depth > self.max_stack:
+                raise StackOverflow(f"stackoverflow: operand stack limit of {self.max_stack} exceeded.")
+            self.peak_depth = depth
+
+    def start_budget(self):
+        # instruction and wall-clock budgets count from here; run() calls it for every program
+        self.instruction_count = 0 # instructions executed, as of the last checkpoint
+        self._countdown = self.check_interval
+        self.deadline = None if self.max_seconds is None else time.monotonic() + self.max_seconds
+
+    def checkpoint(self):
+        if self._countdown < 0:
+            executed = self.check_interval - self._countdown
+            self.instruction_count += executed
+            self._countdown = self.check_interval
+            if self.max_instructions is not None and self.instruction_count > self.max_instructions:
+                raise BudgetExceeded(f"Instruction budget of {self.max_instructions} exceeded.")
+            if self.deadline is not None and time.monotonic() > self.deadline:
+                raise BudgetExceeded(f"Time budget of {self.max_seconds}s exceeded.")
+            if self.max_depth is not None and len(self.exec_stack) > self.max_depth:
+                raise StackOverflow(f"execstackoverflow: execution stack limit of {self.max_depth} exceeded.")
+            if self.execution is not None:
+                self.execution.checkpoint(executed) # may end its slice at the next frame switch
+        self.check_stack()
+
+    # execution ----------------------------------------------------------------------------------------
+    # Procedures run on an explicit execution stack of instruction iterators (exec_stack) rather
+    # than on the Python stack: calling a CodeBlock pushes a frame and the dispatch loop carries
+    # on with it, so recursion depth is bounded by max_depth instead of Python's recursion limit.
+    # Nothing on the way nests a dispatch loop: a fused pair or a compiled procedure that falls
+    # back to its instructions pushes them as a frame too.
+    frame = staticmethod(iter) # makes a frame from instructions; TracingInterpreter wraps it
+
+    def execute(self, instructions):
+        # runs the instructions, and everything they call, to completion
+        base = len(self.exec_stack)
+        self.exec_stack.append(self.frame(instructions))
+        self._run(base)
+
+    def _run(self, base):
+        # dispatches until the execution stack is back down to base; True if a slice paused it
+        try:
+            return self._dispatch(base)
+        except BaseException:
+            self._unwind(base)
+            raise
+
+    def _dispatch(self, base):
+        exec_stack = self.exec_stack
+        op_stack = self.op_stack
+        while len(exec_stack) > base:
+            if self.pausing and not base: # a slices.Execution stops here, its frames kept
+                return True
+            frame = exec_stack[-1]
+            for opcode, operand in frame:
+                if opcode == NAME:
+                    value = self.name_cache.get(operand, _MISSING)
+                    if value is _MISSING:
+                        value = self.resolve(operand)
+                    else:
+                        self.cache_hits += 1
+                    if callable(value):
+                        value(self)
+                        if exec_stack[-1] is not frame: # if, repeat, ... scheduled a procedure
+                            break
+                    elif type(value) is CodeBlock:
+                        self.push_code_block(value)
+                        break
+                    else:
+                        op_stack.append(value)
+                elif opcode == PUSH:
+                    op_stack.append(operand)
+                elif opcode == OPERATOR:
+                    operand(self)
+                    if exec_stack[-1] is not frame:
+                        break
+                elif opcode == FUSED:
+                    operand(self)
+                    if exec_stack[-1] is not frame: # the pair fell back to its two instructions
+                        break
+                elif opcode == CALL:
+                    self.push_procedure(operand)
+                    break
+                elif opcode == PROC:
+                    toks, body = operand
+                    env = self.capture_env() if self.lexical_scoping else None
+                    op_stack.append(CodeBlock(toks, env, body))
+                else:
+                    op_stack.append(copy_literal(operand)) # a string or array literal
+            else:
+                exec_stack.pop()
+
+    def _unwind(self, base):
+        # drops the frames of a failed execute, innermost first; closing a lexical frame restores
+        # the dictionary stack it swapped out
+        exec_stack = self.exec_stack
+        while len(exec_stack) > base:
+            close = getattr(exec_stack.pop(), "close", None)
+            if close is not None:
+                close()
+
+    def resolve(self, token):
+        # dynamic lookup behind a name cache miss
+        self.cache_misses += 1
+        for d in reversed(self.dict_stack):
+            if token in d:
+                value = self.name_cache[token] = d[token]
+                return value
+        raise ParseFailed(f"Undefined token: {token}")
+
+    def push_code_block(self, block):
+        # schedules a procedure call: its frame runs next in the dispatch loop
+        instructions = block.instructions
+        self._countdown -= len(instructions) + 1
+        if self._countdown < 0 or len(self.op_stack) > self.peak_depth:
+            self.checkpoint()
+        if block.env is not None and self.lexical_scoping:
+            instructions = self._lexical_frame(block)
+        self.exec_stack.append(self.frame(instructions))
+
+    _push_code_block = push_code_block # the interpreted call, which the profiler times in place of a subclass's
+
+    def _lexical_frame(self, block):
+        # swap in the block’s env; current_dict copies a level only if the body writes to it
+        dict_stack = self.dict_stack
+        old_stack = dict_stack[:]
+        dict_stack[:] = block.env
+        # the env never changes, so its resolved names are kept on the block across calls
+        old_cache, changes, writes = self.name_cache, self._stack_changes, self._visible_writes
+        self.name_cache = block.name_cache
+        try:
+            yield from block.instructions
+        finally:
+            dict_stack[:] = old_stack
+            if self._stack_changes != changes:
+                # the body defined or begun something, so its cache holds call-local names
+                block.name_cache = {}
+                if old_cache is self.name_cache or self._visible_writes != writes:
+                    old_cache = {}
+            self.name_cache = old_cache
+
+    def push_procedure(self, proc):
+        # schedules the result of parser.compile_procedure, as if by push_code_block
+        if type(proc) is CodeBlock:
+            self.push_code_block(proc)
+        else:
+            self._countdown -= len(proc) + 1
+            if self._countdown < 0 or len(self.op_stack) > self.peak_depth:
+                self.checkpoint()
+            self.exec_stack.append(self.frame(proc))
+
+    def count_iterations(self, block, iterations):
+        # a loop is about to run the CodeBlock this many times; only the JIT keeps count
+        pass
+
+    def push_loop(self, instructions):
+        # schedules a loop body: an iterator of instructions, typically emitting (CALL, proc)
+        self.exec_stack.append(self.frame(instructions))
+
+    # input processing ---------------------------------------------------------------------------------
+    def process_input(self, token):
+        # errors propagate; the repl reports them, batch runs stop on them
+        self.execute((compile_token(token),))
+
+    def run(self, source):
+        # executes a whole program from a file-like object or iterable of chunks
+        op_stack = self.op_stack
+        self.start_budget()
+        for tok in iter_tokens(source):
+            if tok == "quit": # same as leaving the repl
+                break
+            self.process_input(tok)
+            self._countdown -= 1
+            if self._countdown < 0 or len(op_stack) > self.peak_depth:
+                self.checkpoint()
+
+    def run_compiled(self, instructions):
+        # executes a program compiled ahead by bytecode.compile_program, with the same checks as run
+        op_stack = self.op_stack
+        self.start_budget()
+        for instruction in instructions:
+            self.execute((instruction,))
+            self._countdown -= 1
+            if self._countdown < 0 or len(op_stack) > self.peak_depth:
+                self.checkpoint()
+
+    def start(self, source):
+        # runs the program in resumable slices instead, see slices.Execution
+        from ps_interpreter.slices import Execution
+        return Execution(self, source)
+
+    def repl(self):
+        import logging # only the repl reports errors through logging
+        logging.basicConfig(level = logging.ERROR)
+        # prompt changes based on the scoping mode
+        prompt = "lexical REPL> " if self.lexical_scoping else "REPL> "
+        tokenizer = Tokenizer() # keeps unclosed strings, procedures and arrays open across lines
+        while True:
+            line = input("... " if tokenizer.depth else prompt) # reads in the user entered line
+            if not tokenizer.depth and line.lower() == "quit": # checks for user trying to exit
+                break
+            try:
+                for tok in tokenizer.feed(line + "\n"): # loops through the tokens completed by this line
+                    self.process_input(tok) # sends the token to the parser
+            except Exception as e: # an error abandons the rest of the line
+                logging.error(e)
+            logging.debug("Operand Stack: %s", self.op_stack)
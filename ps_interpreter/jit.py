@@ -0,0 +1,227 @@
+"""
+Tiered execution for --jit: procedures that run often are translated to Python functions.
+
+JitInterpreter counts calls to every CodeBlock and the iterations of repeat and for loops over
+it. Once a block reaches JIT_THRESHOLD, its body is translated to Python source and compiled
+with compile(), the operand stack turned into local variables: `dup mul exch dup mul add sqrt`
+becomes a handful of arithmetic statements over two stack reads and one write.
+
+Only bodies without side effects are translated: literals, reading variables, dup, exch, pop,
+and the arithmetic and comparison operators. The compiled function reads its operands without
+popping them and writes its results back in one step, so whenever anything does not go as
+planned (an operator name now resolves to something else, a variable became a procedure, a
+type or a zero divisor makes an operator fail, or the stack is too short) it leaves the stack
+as it found it and returns False, and the original body is pushed as an ordinary frame on the
+execution stack, which then does exactly what it would have done anyway, errors and deep
+recursion included. A procedure that is redefined is a new CodeBlock and
+is interpreted until it gets hot itself; bind drops anything compiled for the old body.
+"""
+import math
+from ps_interpreter.core import CodeBlock, copy_literal
+from ps_interpreter.interpreter import Interpreter
+from ps_interpreter.parser import PUSH, NAME, ARRAY, FUSED, OPERATOR
+from ps_interpreter import operations as ops
+
+JIT_THRESHOLD = 200 # calls plus loop iterations before a block is compiled
+
+_MISSING = object()
+
+class _Bail(Exception):
+    pass
+
+def _integers(fn):
+    # idiv and mod: anything the interpreter would reject bails out to it
+    def checked(op1, op2):
+        if isinstance(op1, int) and isinstance(op2, int) and op2 != 0:
+            return fn(op1, op2)
+        raise _Bail
+    return checked
+
+def _sqrt(op):
+    if op >= 0:
+        return math.sqrt(op)
+    raise _Bail
+
+# operator -> how it is translated: a Python operator for binary ones, or a function to call
+_BINARY = {
+    ops.operations["add"]: "+",
+    ops.operations["sub"]: "-",
+    ops.operations["mul"]: "*",
+    ops.operations["div"]: "/", # Python raises on a zero divisor exactly where div does
+    ops.operations["eq"]:  "==",
+    ops.operations["ne"]:  "!=",
+    ops.operations["ge"]:  ">=",
+    ops.operations["gt"]:  ">",
+    ops.operations["le"]:  "<=",
+    ops.operations["lt"]:  "<",
+}
+_CALLS = {
+    ops.operations["idiv"]:    (2, _integers(ops._truncating_div)),
+    ops.operations["mod"]:     (2, _integers(ops._remainder)),
+    ops.operations["abs"]:     (1, abs),
+    ops.operations["neg"]:     (1, lambda op: -op),
+    ops.operations["ceiling"]: (1, math.ceil),
+    ops.operations["floor"]:   (1, math.floor),
+    ops.operations["round"]:   (1, ops._round),
+    ops.operations["sqrt"]:    (1, _sqrt),
+}
+_DUP, _EXCH, _POP = ops.operations["dup"], ops.operations["exch"], ops.operations["pop"]
+_CHECKED = {fn: ops.operations[name] for name, fn in ops.unchecked.items()} # translated alike
+
+
+class _Translator:
+    # symbolic execution of a body: the stack holds Python expressions (locals and constants)
+    def __init__(self, resolve):
+        self.resolve = resolve # name -> its current value, or _MISSING
+        self.lines = []
+        self.namespace = {"_Bail": _Bail, "_MISSING": _MISSING, "CodeBlock": CodeBlock,
+                          "copy_literal": copy_literal}
+        self.stack = []
+        self.inputs = 0 # operands taken from below the stack the body started with
+        self.guards = {} # operator name -> the operator it must still resolve to
+
+    def constant(self, value):
+        key = f"k{len(self.namespace)}"
+        self.namespace[key] = value
+        return key
+
+    def temp(self, expression):
+        name = f"t{len(self.lines)}"
+        self.lines.append(f"{name} = {expression}")
+        return name
+
+    def pull(self):
+        if self.stack:
+            return self.stack.pop()
+        self.inputs += 1
+        return f"i{self.inputs}"
+
+    def variable(self, name):
+        key = self.constant(name)
+        value = self.temp(f"get({key}, _MISSING)")
+        self.lines.append(f"if {value} is _MISSING: {value} = interp.resolve({key})")
+        self.lines.append(f"if callable({value}) or type({value}) is CodeBlock: raise _Bail")
+        return value
+
+    def operator(self, fn):
+        fn = _CHECKED.get(fn, fn)
+        stack, pull = self.stack, self.pull
+        if fn in _BINARY:
+            op2, op1 = pull(), pull()
+            stack.append(self.temp(f"{op1} {_BINARY[fn]} {op2}"))
+        elif fn in _CALLS:
+            arity, call = _CALLS[fn]
+            operands = [pull() for _ in range(arity)][::-1]
+            stack.append(self.temp(f"{self.constant(call)}({', '.join(operands)})"))
+        elif fn is _DUP:
+            op = pull()
+            stack += [op, op]
+        elif fn is _EXCH:
+            op2, op1 = pull(), pull()
+            stack += [op2, op1]
+        elif fn is _POP:
+            pull()
+        else:
+            return False
+        return True
+
+    def instruction(self, opcode, operand):
+        # translates one instruction; False if it cannot be
+        if opcode == FUSED:
+            return all(self.instruction(*instruction) for instruction in operand.fallback)
+        if opcode == PUSH:
+            self.stack.append(repr(operand) if type(operand) in (int, bool) else self.constant(operand))
+            return True
+        if opcode == ARRAY:
+            self.stack.append(self.temp(f"copy_literal({self.constant(operand)})"))
+            return True
+        if opcode == OPERATOR:
+            return self.operator(operand)
+        if opcode == NAME:
+            value = self.resolve(operand)
+            if callable(value):
+                self.guards[operand] = value
+                return self.operator(value)
+            if value is _MISSING or type(value) is CodeBlock:
+                return False
+            self.stack.append(self.variable(operand))
+            return True
+        return False # procedures and loops are left to the interpreter
+
+    def source(self):
+        inputs = self.inputs
+        body = ["def native(interp):", "    s = interp.op_stack"]
+        if inputs:
+            body.append(f"    if len(s) < {inputs}: return False")
+        body += ["    try:", "        get = interp.name_cache.get"]
+        for name, fn in self.guards.items():
+            body.append(f"        if get({self.constant(name)}) is not {self.constant(fn)}: raise _Bail")
+        body += [f"        i{n} = s[-{n}]" for n in range(1, inputs + 1)]
+        body += ["        " + line for line in self.lines]
+        body += ["    except Exception:", "        return False"]
+        results = ", ".join(self.stack)
+        if inputs:
+            body.append(f"    s[-{inputs}:] = [{results}]")
+        elif results:
+            body.append(f"    s += [{results}]")
+        return "\n".join(body) + "\n"
+
+def translate(block, resolve):
+    # the compiled function for a CodeBlock's body, or None if it has side effects
+    translator = _Translator(resolve)
+    if not all(translator.instruction(*instruction) for instruction in block.instructions):
+        return None
+    source = translator.source()
+    namespace = translator.namespace
+    namespace["fallback"] = block.instructions
+    exec(compile(source, f"<jit {block.name or 'procedure'}>", "exec"), namespace)
+    native = namespace["native"]
+    native.source = source
+    native.fallback = fallback = block.instructions
+    extra = len(fallback) - 1
+    def step(interp):
+        interp._countdown -= extra # counts as the whole body, as the interpreted one would
+        if native(interp) is False:
+            interp.push_procedure(fallback)
+    step.fallback = fallback
+    native.body = [(FUSED, step)] # stands in for the body inside loops
+    return native
+
+
+class JitInterpreter(Interpreter):
+    jit_threshold = JIT_THRESHOLD
+
+    def push_code_block(self, block):
+        native = block.native
+        if native:
+            self._countdown -= len(native.fallback) + 1
+            if self._countdown < 0 or len(self.op_stack) > self.peak_depth:
+                self.checkpoint()
+            if native(self) is False: # bailed out: the body runs as an ordinary frame
+                self.exec_stack.append(self.frame(native.fallback))
+            return
+        if native is None:
+            block.calls += 1
+            if block.calls >= self.jit_threshold and self.compile(block):
+                return self.push_code_block(block)
+        super().push_code_block(block)
+
+    def count_iterations(self, block, iterations):
+        if block.native is None:
+            block.calls += iterations
+            if block.calls >= self.jit_threshold:
+                self.compile(block)
+
+    def compile(self, block):
+        # compiles a hot block in place; False, and never tried again, if it cannot be compiled
+        native = None
+        if block.env is None or not self.lexical_scoping: # lexical bodies read their own env
+            native = translate(block, self._current_value)
+        block.native = native or False
+        return block.native
+
+    def _current_value(self, name):
+        for d in reversed(self.dict_stack):
+            if name in d:
+                return d[name]
+        return _MISSING
@@ -0,0 +1,149 @@
+"""
+Parallel batch runner: executes many independent PostScript programs across a process pool.
+
+    python -m ps_interpreter batch DIR_OR_MANIFEST [--workers N] [--timeout S] [--max-stack N] [--lexical] [--json]
+
+A directory runs every *.ps file in it (sorted by name); any other file is a manifest with
+one program path per line, relative to the manifest, where blank lines and lines starting
+with '#' are ignored. Results come back in input order.
+"""
+import io
+import os
+import sys
+import json
+import time
+import signal
+import argparse
+import contextlib
+from concurrent.futures import ProcessPoolExecutor
+from ps_interpreter.core import PSString, Name
+from ps_interpreter.interpreter import Interpreter, MAX_STACK
+
+
+class JobTimeout(Exception):
+    """ Exception when a job runs past its time limit """
+    def __init__(self, message):
+        super().__init__(message)
+
+class JobResult:
+    def __init__(self, path, status, output, stack, error, elapsed, peak_stack=0):
+        self.path = path        # program that was run
+        self.status = status    # "ok", "error" or "timeout" ("busy" from a full server)
+        self.output = output    # everything the program printed
+        self.stack = stack      # final operand stack in == form, bottom first
+        self.error = error      # error message, None when status is "ok"
+        self.elapsed = elapsed  # seconds spent in the worker
+        self.peak_stack = peak_stack # deepest operand stack the job reached
+
+    def to_dict(self):
+        return dict(self.__dict__)
+
+
+# job discovery ---------------------------------------------------------------------------------------
+def load_jobs(target):
+    # expands a directory or manifest into the list of program paths
+    if os.path.isdir(target):
+        names = sorted(n for n in os.listdir(target) if n.endswith(".ps"))
+        return [os.path.join(target, n) for n in names]
+    base = os.path.dirname(target)
+    with open(target, encoding="utf-8") as f:
+        lines = [line.strip() for line in f]
+    return [os.path.join(base, line) for line in lines if line and not line.startswith("#")]
+
+
+# worker side -----------------------------------------------------------------------------------------
+_worker = None # the warm interpreter of this worker process
+
+def _init_worker(lexical, max_stack=MAX_STACK):
+    global _worker
+    _worker = Interpreter(lexical=lexical, max_stack=max_stack) # operators registered once per worker, not per job
+
+def _on_alarm(signum, frame):
+    raise JobTimeout("Job timed out.")
+
+@contextlib.contextmanager
+def _deadline(seconds):
+    # interrupts the job with JobTimeout after the given seconds (where SIGALRM exists)
+    if not seconds or not hasattr(signal, "setitimer"):
+        yield
+        return
+    previous = signal.signal(signal.SIGALRM, _on_alarm)
+    signal.setitimer(signal.ITIMER_REAL, seconds)
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+def _format(value):
+    return repr(value) if isinstance(value, (PSString, Name)) else str(value)
+
+def _run_job(job):
+    path, timeout = job
+    return _run_program(path, lambda: open(path, encoding="latin-1"), timeout)
+
+def _run_source(job):
+    # a program sent as text, e.g. by the server
+    name, source, timeout = job
+    return _run_program(name, lambda: io.StringIO(source), timeout)
+
+def _run_program(name, open_source, timeout):
+    interp = _worker
+    interp.reset()
+    interp.output = out = io.StringIO()
+    status, error = "ok", None
+    start = time.perf_counter()
+    try:
+        with _deadline(timeout):
+            with open_source() as f:
+                interp.run(f)
+    except JobTimeout:
+        status, error = "timeout", f"Timed out after {timeout}s."
+    except Exception as e:
+        status, error = "error", str(e) or type(e).__name__
+    elapsed = time.perf_counter() - start
+    stack = [_format(v) for v in interp.op_stack]
+    return JobResult(name, status, out.getvalue(), stack, error, elapsed, interp.peak_depth)
+
+
+# public api ------------------------------------------------------------------------------------------
+def run_jobs(paths, workers=None, timeout=None, lexical=False, max_stack=MAX_STACK):
+    # runs every program in its own clean interpreter state; returns JobResults in input order
+    paths = list(paths)
+    if not paths:
+        return []
+    workers = workers or os.cpu_count() or 1
+    chunksize = max(1, len(paths) // (workers * 4)) # fewer round trips for many small jobs
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(lexical, max_stack)) as pool:
+        return list(pool.map(_run_job, [(p, timeout) for p in paths], chunksize=chunksize))
+
+
+# command line ----------------------------------------------------------------------------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m ps_interpreter batch",
+        description="Run many PostScript programs across a process pool"
+    )
+    parser.add_argument("target", help="Directory of .ps files, or a manifest listing one program per line.")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count).")
+    parser.add_argument("--timeout", type=float, default=None, help="Per-job time limit in seconds.")
+    parser.add_argument("--max-stack", type=int, default=MAX_STACK, help="Operand stack limit per job, in entries.")
+    parser.add_argument("--lexical", action="store_true", help="Use lexical scoping instead of dynamic.")
+    parser.add_argument("--json", action="store_true", help="Print one JSON object per job instead of text.")
+    args = parser.parse_args(argv)
+
+    results = run_jobs(load_jobs(args.target), workers=args.workers, timeout=args.timeout,
+                       lexical=args.lexical, max_stack=args.max_stack)
+    out = io.StringIO()
+    for r in results:
+        if args.json:
+            out.write(json.dumps(r.to_dict()) + "\n")
+        else:
+            out.write(f"==> {r.path} <== {r.status}\n{r.output}")
+            if r.output and not r.output.endswith("\n"):
+                out.write("\n")
+            if r.error:
+                out.write(f"error: {r.error}\n")
+    sys.stdout.write(out.getvalue())
+    sys.stdout.flush()
+    return 0 if all(r.status == "ok" for r in results) else 1
@@ -1,181 +1,216 @@
 # IMPORTS ----------------------------------------------------------------------------------------------
+import sys
 import math
+import operator
+import itertools
 import ps_interpreter.core as core
+import ps_interpreter.parser as parser # only used at call time: parser imports this module too
 
 PSDict         = core.PSDict
-op_stack       = core.op_stack
-dict_stack     = core.dict_stack
+CodeBlock      = core.CodeBlock
+NumericArray   = core.NumericArray
+PSString       = core.PSString
+Name           = core.Name
 StackUnderflow = core.StackUnderflow
 TypeMismatch   = core.TypeMismatch
 
-from ps_interpreter.parser import process_input
+# SIGNATURES -------------------------------------------------------------------------------------------
+NUMBER  = (int, float)
+INTEGER = (int,)
+STRING  = (PSString,)
+NAME    = (Name,)
+DICT    = (dict,)
+ARRAY   = (list, NumericArray)
+PROC    = (list, CodeBlock)
+ARITHMETIC = NUMBER + (NumericArray,) # add, sub, mul and div also work element-wise
+
+class Signature:
+    def __init__(self, pops, pushes, types=None):
+        self.pops = pops       # operands taken off the stack, None when it depends on the operands
+        self.pushes = pushes   # results left on the stack, None when it depends on the operands
+        self.types = types     # accepted types per operand, bottom first; None accepts anything
+
+signatures = {
+    # stack manipulation
+    "exch":  Signature(2, 2),
+    "pop":   Signature(1, 0),
+    "copy":  Signature(None, None),
+    "dup":   Signature(1, 2),
+    "clear": Signature(None, 0),
+    "count": Signature(0, 1),
+    # arithmetic
+    "add":     Signature(2, 1, (ARITHMETIC, ARITHMETIC)),
+    "sub":     Signature(2, 1, (ARITHMETIC, ARITHMETIC)),
+    "mul":     Signature(2, 1, (ARITHMETIC, ARITHMETIC)),
+    "div":     Signature(2, 1, (ARITHMETIC, ARITHMETIC)),
+    "idiv":    Signature(2, 1, (INTEGER, INTEGER)),
+    "mod":     Signature(2, 1, (INTEGER, INTEGER)),
+    "abs":     Signature(1, 1, (NUMBER,)),
+    "neg":     Signature(1, 1, (NUMBER,)),
+    "ceiling": Signature(1, 1, (NUMBER,)),
+    "floor":   Signature(1, 1, (NUMBER,)),
+    "round":   Signature(1, 1, (NUMBER,)),
+    "sqrt":    Signature(1, 1, (NUMBER,)),
+    # dictionary
+    "dict":      Signature(1, 1, (INTEGER,)),
+    "length":    Signature(1, 1),
+    "maxlength": Signature(1, 1),
+    "begin":     Signature(1, 0, (DICT,)),
+    "end":       Signature(0, 0),
+    "def":       Signature(2, 0, (NAME, None)),
+    # strings
+    "string":       Signature(1, 1, (INTEGER,)),
+    "get":          Signature(2, 1, (None, INTEGER)),
+    "getinterval":  Signature(3, 1, (None, INTEGER, INTEGER)),
+    "putinterval":  Signature(3, 1, (None, INTEGER, None)),
+    # arrays
+    "sum": Signature(1, 1, (ARRAY,)),
+    "min": Signature(1, 1, (ARRAY,)),
+    "max": Signature(1, 1, (ARRAY,)),
+    # bit and boolean operations
+    "eq":  Signature(2, 1),
+    "ne":  Signature(2, 1),
+    "ge":  Signature(2, 1),
+    "gt":  Signature(2, 1),
+    "le":  Signature(2, 1),
+    "lt":  Signature(2, 1),
+    "and": Signature(2, 1, (INTEGER, INTEGER)), # bools are ints too
+    "not": Signature(1, 1, (INTEGER,)),
+    "or":  Signature(2, 1, (INTEGER, INTEGER)),
+    # flow control
+    "if":        Signature(2, None, (bool, PROC)),
+    "ifelse":    Signature(3, None, (bool, PROC, PROC)),
+    "repeat":    Signature(2, None, (INTEGER, PROC)),
+    "for":       Signature(4, None, (NUMBER, NUMBER, NUMBER, PROC)),
+    "bind":      Signature(1, 1, (PROC,)),
+    # input and output
+    "print":     Signature(1, 0, (STRING,)),
+    "=":         Signature(1, 0),
+    "==":        Signature(1, 0),
+}
+
+# GENERATED OPERATIONS ---------------------------------------------------------------------------------
+# Operators that only transform their operands are generated from their signature: a single pop,
+# then the result overwrites the remaining operand's slot in place instead of pop, pop, append.
+def _binary(name, fn, nonzero=False):
+    integers = signatures[name].types == (INTEGER, INTEGER)
+    underflow = f"Need 2 operands for {name}."
+    if not (integers or nonzero):
+        def binary_operation(interp):
+            op_stack = interp.op_stack
+            if len(op_stack) < 2:
+                raise StackUnderflow(underflow)
+            op2 = op_stack.pop()
+            op_stack[-1] = fn(op_stack[-1], op2)
+    else:
+        mismatch = f"Operands must be integers for {name}."
+        def binary_operation(interp):
+            op_stack = interp.op_stack
+            if len(op_stack) < 2:
+                raise StackUnderflow(underflow)
+            op2 = op_stack.pop()
+            if integers and not (isinstance(op_stack[-1], int) and isinstance(op2, int)):
+                op_stack.pop()
+                raise TypeMismatch(mismatch)
+            if op2 == 0:
+                op_stack.pop()
+                raise ValueError("Division by zero.")
+            op_stack[-1] = fn(op_stack[-1], op2)
+    binary_operation.__name__ = binary_operation.__qualname__ = f"{name}_operation"
+    return binary_operation
+
+def _unary(name, fn):
+    underflow = f"Need 1 operand for {name}."
+    def unary_operation(interp):
+        op_stack = interp.op_stack
+        if not op_stack:
+            raise StackUnderflow(underflow)
+        op_stack[-1] = fn(op_stack[-1])
+    unary_operation.__name__ = unary_operation.__qualname__ = f"{name}_operation"
+    return unary_operation
 
 # OPERATIONS -------------------------------------------------------------------------------------------
 
 # Stack Manipulation
-def exch_operation():
+def exch_operation(interp):
+    op_stack = interp.op_stack
     if len(op_stack) >= 2:
-        op2 = op_stack.pop()
-        op1 = op_stack.pop()
-        op_stack.append(op2)
-        op_stack.append(op1)
+        op_stack[-1], op_stack[-2] = op_stack[-2], op_stack[-1]
     else:
         raise StackUnderflow("Need 2 operands for exch.")
 
-def pop_operation():
+def pop_operation(interp):
+    op_stack = interp.op_stack
     if len(op_stack) >= 1:
         op_stack.pop()
     else:
         raise StackUnderflow("Need 1 operand for pop.")
     
-def copy_operation():
+def copy_operation(interp):
+    op_stack = interp.op_stack
     if len(op_stack) >= 1:
         n = op_stack.pop()
         if n < 0:
             raise ValueError("Negative count for copy.")
         if len(op_stack) >= n:
-            op_stack.extend(op_stack[-n:]) # gets the last n elements and appends them onto the stack
+            interp.check_stack(n)
+            op_stack.extend(op_stack[len(op_stack) - n:]) # gets the last n elements and appends them onto the stack
         else:
             raise StackUnderflow(f"There are not {n} operands on the stack.")
     else:
         raise StackUnderflow("Need 1 operand for copy.")    
 
-def dup_operation():
+def dup_operation(interp):
+    op_stack = interp.op_stack
     if len(op_stack) >= 1:
         op_stack.append(op_stack[-1])
     else:
         raise StackUnderflow("Need 1 operand for dup.")
     
-def clear_operation():
+def clear_operation(interp):
+    op_stack = interp.op_stack
     op_stack.clear() # empties the list in-place
 
-def count_operation():
+def count_operation(interp):
+    op_stack = interp.op_stack
     op_stack.append(len(op_stack))
 
 # Arithmetic
-def add_operation():
-    if len(op_stack) >= 2:
-        op2 = op_stack.pop()
-        op1 = op_stack.pop()
-        res = op1 + op2
-        op_stack.append(res)
-    else:
-        raise StackUnderflow("Need 2 operands for add.")
-
-def sub_operation():
-    if len(op_stack) >= 2:
-        op2 = op_stack.pop()
-        op1 = op_stack.pop()
-        res = op1 - op2
-        op_stack.append(res)
-    else:
-        raise StackUnderflow("Need 2 operands for sub.")
-
-def mul_operation():
-    if len(op_stack) >= 2:
-        op2 = op_stack.pop()
-        op1 = op_stack.pop()
-        res = op1 * op2
-        op_stack.append(res)
-    else:
-        raise StackUnderflow("Need 2 operands for mul.")
-
-def div_operation():
-    if len(op_stack) >= 2:
-        op2 = op_stack.pop()
-        op1 = op_stack.pop()
-        if op2 != 0:
-            res = op1 / op2
-            op_stack.append(res)
-        else:
-            raise ValueError("Division by zero.")
-    else:
-        raise StackUnderflow("Need 2 operands for div.")
-
-def idiv_operation():
-    if len(op_stack) >= 2:
-        op2 = op_stack.pop()
-        op1 = op_stack.pop()
-        if isinstance(op1, int) and isinstance(op2, int):
-            if op2 != 0:
-                res = int(op1 / op2) # truncates result towards 0
-                op_stack.append(res)
-            else:
-                raise ValueError("Division by zero.")
-        else:
-            raise TypeMismatch("Operands must be integers for idiv.")
-    else:
-        raise StackUnderflow("Need 2 operands for idiv.")
-
-def mod_operation():
-    if len(op_stack) >= 2:
-        op2 = op_stack.pop()
-        op1 = op_stack.pop()
-        if isinstance(op1, int) and isinstance(op2, int):
-            if op2 != 0:
-                res = int(op1 / op2) # truncates result towards 0
-                res = op1 - (op2 * res) # gives remainder
-                op_stack.append(res)
-            else:
-                raise ValueError("Division by zero.")
-        else:
-            raise TypeMismatch("Operands must be integers for mod.")
-    else:
-        raise StackUnderflow("Need 2 operands for mod.")
-
-def abs_operation():
-    if len(op_stack) >= 1:
-        op = op_stack.pop()
-        res = abs(op)
-        op_stack.append(res)
-    else:
-        raise StackUnderflow("Need 1 operand for abs.")
-
-def neg_operation():
+def _truncating_div(op1, op2):
+    return int(op1 / op2) # truncates result towards 0
+
+def _remainder(op1, op2):
+    return op1 - (op2 * int(op1 / op2)) # gives remainder
+
+def _round(op):
+    return math.floor(op + 0.5) if op >= 0 else math.ceil(op - 0.5)
+
+add_operation     = _binary("add", operator.add)
+sub_operation     = _binary("sub", operator.sub)
+mul_operation     = _binary("mul", operator.mul)
+div_operation     = _binary("div", operator.truediv, nonzero=True)
+idiv_operation    = _binary("idiv", _truncating_div, nonzero=True)
+mod_operation     = _binary("mod", _remainder, nonzero=True)
+abs_operation     = _unary("abs", abs)
+neg_operation     = _unary("neg", operator.neg)
+ceiling_operation = _unary("ceiling", math.ceil)
+floor_operation   = _unary("floor", math.floor)
+round_operation   = _unary("round", _round)
+
+def sqrt_operation(interp):
+    op_stack = interp.op_stack
     if len(op_stack) >= 1:
-        op = op_stack.pop()
-        res = -op
-        op_stack.append(res)
-    else:
-        raise StackUnderflow("Need 1 operand for neg.")
-
-def ceiling_operation():
-    if len(op_stack) >= 1:
-        op = op_stack.pop()
-        res = math.ceil(op)
-        op_stack.append(res)
-    else:
-        raise StackUnderflow("Need 1 operand for ceiling.")
-
-def floor_operation():
-    if len(op_stack) >= 1:
-        op = op_stack.pop()
-        res = math.floor(op)
-        op_stack.append(res)
-    else:
-        raise StackUnderflow("Need 1 operand for floor.")
-
-def round_operation():
-    if len(op_stack) >= 1:
-        op = op_stack.pop()
-        res = math.floor(op + 0.5) if op >= 0 else math.ceil(op - 0.5)
-        op_stack.append(res)
-    else:
-        raise StackUnderflow("Need 1 operand for round.")
-
-def sqrt_operation():
-    if len(op_stack) >= 1:
-        op = op_stack.pop()
-        if op >= 0:
-            res = math.sqrt(op)
-            op_stack.append(res)
+        if op_stack[-1] >= 0:
+            op_stack[-1] = math.sqrt(op_stack[-1])
         else:
+            op_stack.pop()
             raise ValueError("Negative operand needed for sqrt.")
     else:
         raise StackUnderflow("Need 1 operand for sqrt.")
 
 # Dictionary
-def dict_operation():
+def dict_operation(interp):
+    op_stack = interp.op_stack
     if len(op_stack) < 1:
         raise StackUnderflow("Need 1 operand for dict.")
     n = op_stack.pop()
@@ -183,57 +218,76 @@ def dict_operation():
         raise TypeMismatch("Operand must be non-negative integer for dict.")
     op_stack.append(PSDict(n))
 
-def length_operation(): # can be used for string also
+def length_operation(interp): # can be used for string also
+    op_stack = interp.op_stack
     if len(op_stack) >= 1:
         obj = op_stack.pop()
-        if isinstance(obj, (str, list, dict)):
+        if isinstance(obj, (PSString, list, NumericArray, dict)):
             op_stack.append(len(obj))
         else:
             raise TypeMismatch("Unsupported type for length.")
     else:
         raise StackUnderflow("Need 1 operand for length.")
 
-def maxlength_operation():
+def maxlength_operation(interp):
+    op_stack = interp.op_stack
     if len(op_stack) < 1:
         raise StackUnderflow("Need 1 operand for maxlength.")
     obj = op_stack.pop()
     if isinstance(obj, PSDict):
         op_stack.append(obj.maxlength)
-    elif isinstance(obj, (str, list, dict)):
+    elif isinstance(obj, (PSString, list, NumericArray, dict)):
         op_stack.append(len(obj))
     else:
         raise TypeMismatch("Unsupported type for maxlength.")
 
-def begin_operation():
+def begin_operation(interp):
+    op_stack = interp.op_stack
+    dict_stack = interp.dict_stack
     if len(op_stack) >= 1:
         d = op_stack.pop()
         if isinstance(d, dict):
             dict_stack.append(d)
+            interp.invalidate_names()
         else:
             raise TypeMismatch("Operand must be dictionary for begin.")
     else:
         raise StackUnderflow("Need 1 operand for begin.")
     
-def end_operation():
-    if len(dict_stack) > 1:
+def end_operation(interp):
+    dict_stack = interp.dict_stack
+    if len(dict_stack) > 2: # systemdict and userdict always stay
         dict_stack.pop()
+        interp.invalidate_names()
     else:
         raise StackUnderflow("Dictionary stack underflow for end.")    
 
-def def_operation():
+def def_operation(interp):
+    op_stack = interp.op_stack
     if len(op_stack) >= 2:
         value = op_stack.pop()
         name = op_stack.pop()
-        if isinstance(name, str) and name.startswith("/"):
-            key = name[1:]
-            dict_stack[-1][key] = value
+        if type(name) is Name:
+            if interp.autobind and type(value) is CodeBlock:
+                bind(interp, value)
+            interp.define(name.key, value)
         else:
-            raise TypeMismatch("Key must be string for def.")
+            raise TypeMismatch("Key must be a name for def.")
     else:
         raise StackUnderflow("Need 2 operands for def.")
 
 # Strings
-def get_operation():
+def string_operation(interp):
+    op_stack = interp.op_stack
+    if len(op_stack) < 1:
+        raise StackUnderflow("Need 1 operand for string.")
+    n = op_stack.pop()
+    if not isinstance(n, int) or n < 0:
+        raise TypeMismatch("Operand must be non-negative integer for string.")
+    op_stack.append(PSString(bytearray(n))) # n zero bytes, to be filled with putinterval
+
+def get_operation(interp):
+    op_stack = interp.op_stack
     if len(op_stack) >= 2:
         index = op_stack.pop()
         container = op_stack.pop()
@@ -241,12 +295,12 @@ def get_operation():
         if not isinstance(index, int):
             raise TypeMismatch("Index must be integer for get.")
 
-        if isinstance(container, str):
+        if isinstance(container, PSString):
             if 0 <= index < len(container):
-                op_stack.append(ord(container[index]))
+                op_stack.append(container[index])
             else:
                 raise ValueError("Index out of range for get.")
-        elif isinstance(container, list):
+        elif isinstance(container, ARRAY):
             if 0 <= index < len(container):
                 op_stack.append(container[index])
             else:
@@ -256,7 +310,8 @@ def get_operation():
     else:
         raise StackUnderflow("Need 2 operands for get.")
 
-def getinterval_operation():
+def getinterval_operation(interp):
+    op_stack = interp.op_stack
     if len(op_stack) >= 3:
         count = op_stack.pop()
         index = op_stack.pop()
@@ -267,12 +322,12 @@ def getinterval_operation():
         if count < 0:
             raise ValueError("Negative count for getinterval.")
 
-        if isinstance(container, str):
+        if isinstance(container, PSString):
             if 0 <= index <= len(container) - count:
-                op_stack.append(container[index:index + count])
+                op_stack.append(container.interval(index, count)) # shares the container's bytes
             else:
                 raise ValueError("Index range out of bounds for getinterval.")
-        elif isinstance(container, list):
+        elif isinstance(container, ARRAY):
             if 0 <= index <= len(container) - count:
                 op_stack.append(container[index:index + count])
             else:
@@ -282,7 +337,8 @@ def getinterval_operation():
     else:
         raise StackUnderflow("Need 3 operands for getinterval.")
 
-def putinterval_operation():
+def putinterval_operation(interp):
+    op_stack = interp.op_stack
     if len(op_stack) >= 3:
         source = op_stack.pop()
         index  = op_stack.pop()
@@ -293,7 +349,8 @@ def putinterval_operation():
             raise TypeMismatch("Index must be integer for putinterval.")
         if index < 0:
             raise ValueError("Negative index for putinterval.")
-        if type(container) != type(source) or not isinstance(container, (str, list)):
+        if not (isinstance(container, PSString) and isinstance(source, PSString) or
+                isinstance(container, ARRAY) and isinstance(source, ARRAY)):
             raise TypeMismatch("Container and source must be same type (string or array).")
 
         count = len(source)
@@ -303,64 +360,46 @@ def putinterval_operation():
         # perform the write
         if isinstance(container, list):
             container[index:index + count] = source
+        elif isinstance(container, NumericArray):
+            container[index:index + count] = source # unboxed storage becomes a list if it must
         else:
-            container = container[:index] + source + container[index + count:]
+            container.put(index, source)
 
         # push the container back so caller still has it
         op_stack.append(container)
     else:
         raise StackUnderflow("Need 3 operands for putinterval.")
 
-# Bit and Boolean Operations
-def eq_operation():
-    if len(op_stack) >= 2:
-        op2 = op_stack.pop()
-        op1 = op_stack.pop()
-        op_stack.append(op1 == op2)
-    else:
-        raise StackUnderflow("Need 2 operands for eq.")
-
-def ne_operation():
-    if len(op_stack) >= 2:
-        op2 = op_stack.pop()
-        op1 = op_stack.pop()
-        op_stack.append(op1 != op2)
-    else:
-        raise StackUnderflow("Need 2 operands for ne.")
-    
-def ge_operation():
-    if len(op_stack) >= 2:
-        op2 = op_stack.pop()
-        op1 = op_stack.pop()
-        op_stack.append(op1 >= op2)
-    else:
-        raise StackUnderflow("Need 2 operands for ge.")
+# Arrays
+def _reduction(name, fn):
+    underflow = f"Need 1 operand for {name}."
+    def reduction_operation(interp):
+        op_stack = interp.op_stack
+        if not op_stack:
+            raise StackUnderflow(underflow)
+        arr = op_stack.pop()
+        if not isinstance(arr, ARRAY):
+            raise TypeMismatch(f"Operand to {name} must be an array.")
+        if not arr and fn is not sum:
+            raise ValueError(f"Empty array for {name}.")
+        op_stack.append(fn(arr))
+    reduction_operation.__name__ = reduction_operation.__qualname__ = f"{name}_operation"
+    return reduction_operation
+
+sum_operation = _reduction("sum", sum)
+min_operation = _reduction("min", min)
+max_operation = _reduction("max", max)
 
-def gt_operation():
-    if len(op_stack) >= 2:
-        op2 = op_stack.pop()
-        op1 = op_stack.pop()
-        op_stack.append(op1 > op2)
-    else:
-        raise StackUnderflow("Need 2 operands for gt.")
-    
-def le_operation():
-    if len(op_stack) >= 2:
-        op2 = op_stack.pop()
-        op1 = op_stack.pop()
-        op_stack.append(op1 <= op2)
-    else:
-        raise StackUnderflow("Need 2 operands for le.")    
-
-def lt_operation():
-    if len(op_stack) >= 2:
-        op2 = op_stack.pop()
-        op1 = op_stack.pop()
-        op_stack.append(op1 < op2)
-    else:
-        raise StackUnderflow("Need 2 operands for lt.")
+# Bit and Boolean Operations
+eq_operation = _binary("eq", operator.eq)
+ne_operation = _binary("ne", operator.ne)
+ge_operation = _binary("ge", operator.ge)
+gt_operation = _binary("gt", operator.gt)
+le_operation = _binary("le", operator.le)
+lt_operation = _binary("lt", operator.lt)
     
-def and_operation():
+def and_operation(interp):
+    op_stack = interp.op_stack
     if len(op_stack) >= 2:
         op2 = op_stack.pop()
         op1 = op_stack.pop()
@@ -376,7 +415,8 @@ def and_operation():
     else:
         raise StackUnderflow("Need 2 operands for and.")
     
-def not_operation():
+def not_operation(interp):
+    op_stack = interp.op_stack
     if len(op_stack) >= 1:
         op = op_stack.pop()
         if isinstance(op, bool):
@@ -389,7 +429,8 @@ def not_operation():
     else:
         raise StackUnderflow("Need 1 operand for not.")
     
-def or_operation():
+def or_operation(interp):
+    op_stack = interp.op_stack
     if len(op_stack) < 2:
         raise StackUnderflow("Need 2 operands for or.")
     op2 = op_stack.pop()
@@ -403,93 +444,215 @@ def or_operation():
     op_stack.append(res)
 
 # Flow Control
-def if_operation():
+def if_operation(interp):
+    op_stack = interp.op_stack
     if len(op_stack) < 2:
         raise StackUnderflow("Need 2 operands for if.")
     proc = op_stack.pop()
     cond = op_stack.pop()
-    if not isinstance(proc, list):
+    if not isinstance(proc, (list, CodeBlock)):
         raise TypeMismatch("Second operand to if must be a code block.")
     if not isinstance(cond, bool):
         raise TypeMismatch("First operand to if must be a boolean.")
     if cond:
-        for tok in proc:
-            process_input(tok)
+        interp.push_procedure(parser.compile_procedure(proc))
 
-def ifelse_operation():
+def ifelse_operation(interp):
+    op_stack = interp.op_stack
     if len(op_stack) < 3:
         raise StackUnderflow("Need 3 operands for ifelse.")
     proc2 = op_stack.pop()
     proc1 = op_stack.pop()
     cond  = op_stack.pop()
-    if not (isinstance(proc1, list) and isinstance(proc2, list)):
+    if not (isinstance(proc1, (list, CodeBlock)) and isinstance(proc2, (list, CodeBlock))):
         raise TypeMismatch("Both branches to ifelse must be code blocks.")
     if not isinstance(cond, bool):
         raise TypeMismatch("First operand to ifelse must be a boolean.")
     chosen = proc1 if cond else proc2
-    for tok in chosen:
-        process_input(tok)
+    interp.push_procedure(parser.compile_procedure(chosen))
 
-def repeat_operation():
+def repeat_operation(interp):
+    op_stack = interp.op_stack
     if len(op_stack) < 2:
         raise StackUnderflow("Need 2 operands for repeat.")
     proc = op_stack.pop()
     count = op_stack.pop()
-    if not isinstance(proc, list):
+    if not isinstance(proc, (list, CodeBlock)):
         raise TypeMismatch("Second operand to repeat must be a code block.")
     if not isinstance(count, int):
         raise TypeMismatch("First operand to repeat must be an integer.")
-    for _ in range(count):
-        for tok in proc:
-            process_input(tok)
+    _repeat(interp, count, proc)
 
-def for_operation():
+def _repeat(interp, count, proc):
+    if count <= 0: # a body that never runs is neither compiled nor counted as hot
+        return
+    proc = parser.compile_procedure(proc) # compile an array body once, not per iteration
+    body, size = _loop_body(interp, proc, count)
+    if body is None:
+        interp.push_loop(itertools.repeat((parser.CALL, proc), count))
+    else:
+        interp.push_loop(_repeat_loop(interp, body, size, count))
+
+def for_operation(interp):
+    op_stack = interp.op_stack
     if len(op_stack) < 4:
         raise StackUnderflow("Need 4 operands for for.")
     proc = op_stack.pop()
     limit = op_stack.pop()
     step  = op_stack.pop()
     init  = op_stack.pop()
-    if not isinstance(proc, list):
+    if not isinstance(proc, (list, CodeBlock)):
         raise TypeMismatch("Fourth operand to for must be a code block.")
     if not all(isinstance(x, (int,float)) for x in (init,step,limit)):
         raise TypeMismatch("First three operands to for must be numbers.")
-    i = init
-    if step > 0:
-        cond = lambda v: v <= limit
-    else:
-        cond = lambda v: v >= limit
-    while cond(i):
-        op_stack.append(i)
-        for tok in proc:
-            process_input(tok)
-        i += step
+    _for(interp, init, step, limit, proc)
+
+def _for(interp, init, step, limit, proc):
+    proc = parser.compile_procedure(proc) # compile an array body once, not per iteration
+    body, size = _loop_body(interp, proc, _for_iterations(init, step, limit))
+    interp.push_loop(_for_loop(interp, init, step, limit, proc, body, size))
+
+def _for_iterations(init, step, limit):
+    # how many times a for loop runs its body, for the JIT; an infinite limit never stops
+    try:
+        span = (limit - init) / step if step else -1
+    except OverflowError: # integers too far apart for a float
+        return sys.maxsize
+    if not span >= 0: # negative, or not a number
+        return 0
+    return int(span) + 1 if span < math.inf else sys.maxsize
+
+# Loops run on the interpreter's execution stack as iterators of instructions. A body that needs
+# no environment swap is unrolled into chunks of about one budget interval, so each chunk is a
+# single procedure call and its instructions run without any per-iteration work. The operand
+# stack is checked when each chunk is called, so a chunk also stops short of max_stack: no
+# instruction in it pushes more than one entry (copy checks for itself, and a procedure it calls
+# is checked on entry), and it takes no more iterations than the stack has room for. Once the
+# stack is within one iteration of the limit, chunks are single iterations, checked as each
+# call of a body that is not unrolled is.
+def _loop_body(interp, proc, iterations):
+    # (the body's instructions, the instructions one run of it counts for against the budget);
+    # the body is None when every iteration must be a real call
+    if type(proc) is CodeBlock:
+        if proc.env is not None and interp.lexical_scoping:
+            return None, 0 # a lexical CodeBlock swaps in its environment on each call
+        interp.count_iterations(proc, iterations)
+        if proc.native: # one instruction that counts as the body it was compiled from
+            return proc.native.body, len(proc.instructions)
+        return proc.instructions, len(proc.instructions)
+    return proc, len(proc)
+
+def _chunk_iterations(interp, growth, cost):
+    # iterations in the next chunk of a loop whose body runs cost instructions and leaves at most
+    # growth more entries on the operand stack
+    per_chunk = interp.check_interval // cost
+    if interp.max_stack is not None and growth:
+        per_chunk = min(per_chunk, (interp.max_stack - len(interp.op_stack)) // growth)
+    return max(1, per_chunk)
+
+def _repeat_loop(interp, body, size, count):
+    call = parser.CALL
+    per_chunk, chunk = 0, None
+    while count:
+        n = min(count, _chunk_iterations(interp, size, size + 1))
+        if n != per_chunk: # the same chunk is called again while the stack has room for it
+            per_chunk, chunk = n, body * n
+        yield (call, chunk)
+        count -= n
+
+def _for_loop(interp, i, step, limit, proc, body, size):
+    push, call = parser.PUSH, parser.CALL
+    ascending = step > 0
+    if body is None: # push the control value, then call the body
+        while i <= limit if ascending else i >= limit:
+            yield (push, i)
+            yield (call, proc)
+            i += step
+        return
+    while i <= limit if ascending else i >= limit:
+        chunk = []
+        for _ in range(_chunk_iterations(interp, size + 1, size + 2)):
+            chunk.append((push, i))
+            chunk += body
+            i += step
+            if not (i <= limit if ascending else i >= limit):
+                break
+        yield (call, chunk)
+
+# Procedures
+def _bound_value(interp, name):
+    for d in reversed(interp.dict_stack):
+        if name in d:
+            return d[name]
+    return None
+
+def bind_instructions(interp, instructions):
+    # the instructions with every name that is bound to an operator in the current dictionaries
+    # replaced by the operator itself, nested procedures included; the input is left untouched
+    bound = []
+    for instruction in instructions:
+        opcode, operand = instruction
+        if opcode == parser.NAME:
+            value = _bound_value(interp, operand)
+            if callable(value):
+                instruction = (parser.OPERATOR, value)
+        elif opcode == parser.PROC:
+            toks, body = operand
+            instruction = (parser.PROC, (toks, bind_instructions(interp, body)))
+        elif opcode == parser.FUSED:
+            if all(_bound_value(interp, name) is builtin for name, builtin in operand.guards):
+                instruction = (parser.FUSED, operand.bind(bind_instructions(interp, operand.fallback)))
+        bound.append(instruction)
+    return bound
+
+def bind(interp, block):
+    # PostScript bind, in place: the CodeBlock's body stops looking its operators up by name
+    instructions = bind_instructions(interp, block.instructions)
+    if interp.opt_level:
+        from ps_interpreter.peephole import optimize
+        from ps_interpreter.analysis import specialize
+        instructions = specialize(optimize(instructions, inline=not interp.lexical_scoping))
+    block.instructions = instructions
+    block.native, block.calls = None, 0 # anything the JIT compiled was for the old body
+
+def bind_operation(interp):
+    op_stack = interp.op_stack
+    if len(op_stack) < 1:
+        raise StackUnderflow("Need 1 operand for bind.")
+    proc = op_stack[-1]
+    if type(proc) is CodeBlock:
+        bind(interp, proc)
+    elif not isinstance(proc, list): # an array of tokens has no names to bind yet
+        raise TypeMismatch("Operand to bind must be a procedure.")
 
 # Input and Output
-def print_operation():
+def print_operation(interp):
+    op_stack = interp.op_stack
     if len(op_stack) < 1:
         raise StackUnderflow("Need 1 operand for print.")
     s = op_stack.pop()
-    if not isinstance(s, str):
+    if not isinstance(s, PSString):
         raise TypeMismatch("Operand to print must be a string.")
-    print(s, end='')
+    print(s, end='', file=interp.output)
 
-def equal_operation():
+def equal_operation(interp):
+    op_stack = interp.op_stack
     # single‐equals prints the “PostScript‐ish” value
     if len(op_stack) < 1:
         raise StackUnderflow("Need 1 operand for =.")
     v = op_stack.pop()
-    print(v)
+    print(v, file=interp.output)
 
-def double_eq_operation():
+def double_eq_operation(interp):
+    op_stack = interp.op_stack
     # double‐equals prints a PostScript literal form
     if len(op_stack) < 1:
         raise StackUnderflow("Need 1 operand for ==.")
     v = op_stack.pop()
-    if isinstance(v, str):
-        print(f"({v})")
+    if isinstance(v, (PSString, Name)):
+        print(repr(v), file=interp.output)
     else:
-        print(v)
+        print(v, file=interp.output)
 
 
 # DICTIONARY BATCH REGISTRATION ------------------------------------------------------------------------
@@ -523,9 +686,14 @@ operations = {
     "end":       end_operation,
     "def":       def_operation,
     # strings
+    "string":       string_operation,
     "get":          get_operation,
     "getinterval":  getinterval_operation,
     "putinterval":  putinterval_operation,
+    # arrays
+    "sum": sum_operation,
+    "min": min_operation,
+    "max": max_operation,
     # bit and boolean operations
     "eq":  eq_operation,
     "ne":  ne_operation,
@@ -541,10 +709,271 @@ operations = {
     "ifelse":    ifelse_operation,
     "repeat":    repeat_operation,
     "for":       for_operation,
+    "bind":      bind_operation,
     # input and output
     "print":     print_operation,
     "=":         equal_operation,
     "==":        double_eq_operation,
 }
 
-dict_stack[-1].update(operations)
\ No newline at end of file
+
+# UNCHECKED VARIANTS -----------------------------------------------------------------------------------
+# The same operators without their stack-depth and operand-type checks, for instructions where
+# analysis.specialize has proven from the procedure body that those checks cannot fail. Checks on
+# values (a zero divisor, a negative square root) stay, with the same effect on the stack.
+def _unchecked_binary(name, fn, nonzero=False):
+    if not nonzero:
+        def binary_unchecked(interp):
+            op_stack = interp.op_stack
+            op2 = op_stack.pop()
+            op_stack[-1] = fn(op_stack[-1], op2)
+    else:
+        def binary_unchecked(interp):
+            op_stack = interp.op_stack
+            op2 = op_stack.pop()
+            if op2 == 0:
+                op_stack.pop()
+                raise ValueError("Division by zero.")
+            op_stack[-1] = fn(op_stack[-1], op2)
+    binary_unchecked.__name__ = binary_unchecked.__qualname__ = f"{name}_unchecked"
+    return binary_unchecked
+
+def _unchecked_unary(name, fn):
+    def unary_unchecked(interp):
+        op_stack = interp.op_stack
+        op_stack[-1] = fn(op_stack[-1])
+    unary_unchecked.__name__ = unary_unchecked.__qualname__ = f"{name}_unchecked"
+    return unary_unchecked
+
+def exch_unchecked(interp):
+    op_stack = interp.op_stack
+    op_stack[-1], op_stack[-2] = op_stack[-2], op_stack[-1]
+
+def pop_unchecked(interp):
+    interp.op_stack.pop()
+
+def dup_unchecked(interp):
+    op_stack = interp.op_stack
+    op_stack.append(op_stack[-1])
+
+def sqrt_unchecked(interp):
+    op_stack = interp.op_stack
+    if op_stack[-1] >= 0:
+        op_stack[-1] = math.sqrt(op_stack[-1])
+    else:
+        op_stack.pop()
+        raise ValueError("Negative operand needed for sqrt.")
+
+def and_unchecked(interp): # both operands are known to be booleans or integers
+    op_stack = interp.op_stack
+    op2 = op_stack.pop()
+    op1 = op_stack[-1]
+    op_stack[-1] = op1 and op2 if type(op1) is bool and type(op2) is bool else op1 & op2
+
+def or_unchecked(interp):
+    op_stack = interp.op_stack
+    op2 = op_stack.pop()
+    op1 = op_stack[-1]
+    op_stack[-1] = op1 or op2 if type(op1) is bool and type(op2) is bool else op1 | op2
+
+def not_unchecked(interp):
+    op_stack = interp.op_stack
+    op = op_stack[-1]
+    op_stack[-1] = (not op) if type(op) is bool else ~op
+
+def if_unchecked(interp):
+    op_stack = interp.op_stack
+    proc = op_stack.pop()
+    if op_stack.pop():
+        interp.push_procedure(parser.compile_procedure(proc))
+
+def ifelse_unchecked(interp):
+    op_stack = interp.op_stack
+    proc2 = op_stack.pop()
+    proc1 = op_stack.pop()
+    interp.push_procedure(parser.compile_procedure(proc1 if op_stack.pop() else proc2))
+
+def repeat_unchecked(interp):
+    op_stack = interp.op_stack
+    proc = op_stack.pop()
+    _repeat(interp, op_stack.pop(), proc)
+
+def for_unchecked(interp):
+    op_stack = interp.op_stack
+    proc = op_stack.pop()
+    limit = op_stack.pop()
+    step = op_stack.pop()
+    _for(interp, op_stack.pop(), step, limit, proc)
+
+unchecked = {
+    # stack manipulation
+    "exch": exch_unchecked,
+    "pop":  pop_unchecked,
+    "dup":  dup_unchecked,
+    # arithmetic
+    "add":     _unchecked_binary("add", operator.add),
+    "sub":     _unchecked_binary("sub", operator.sub),
+    "mul":     _unchecked_binary("mul", operator.mul),
+    "div":     _unchecked_binary("div", operator.truediv, nonzero=True),
+    "idiv":    _unchecked_binary("idiv", _truncating_div, nonzero=True),
+    "mod":     _unchecked_binary("mod", _remainder, nonzero=True),
+    "abs":     _unchecked_unary("abs", abs),
+    "neg":     _unchecked_unary("neg", operator.neg),
+    "ceiling": _unchecked_unary("ceiling", math.ceil),
+    "floor":   _unchecked_unary("floor", math.floor),
+    "round":   _unchecked_unary("round", _round),
+    "sqrt":    sqrt_unchecked,
+    # bit and boolean operations
+    "eq":  _unchecked_binary("eq", operator.eq),
+    "ne":  _unchecked_binary("ne", operator.ne),
+    "ge":  _unchecked_binary("ge", operator.ge),
+    "gt":  _unchecked_binary("gt", operator.gt),
+    "le":  _unchecked_binary("le", operator.le),
+    "lt":  _unchecked_binary("lt", operator.lt),
+    "and": and_unchecked,
+    "not": not_unchecked,
+    "or":  or_unchecked,
+    # flow control
+    "if":     if_unchecked,
+    "ifelse": ifelse_unchecked,
+    "repeat": repeat_unchecked,
+    "for":    for_unchecked,
+}
+# operators whose checked version also rejects operand types: their variant needs the types of the
+# operands proven against the signature, not only the stack depth
+type_checked = {"idiv", "mod", "and", "or", "not", "if", "ifelse", "repeat", "for"}
+
+
+# SUPERINSTRUCTIONS ------------------------------------------------------------------------------------
+# The compiler replaces common instruction pairs with one fused call. Each fast path only runs while
+# the names still resolve to the builtin operators (through the interpreter's name cache) and the
+# stack is deep enough; otherwise the original pair is pushed as a frame of its own on the execution
+# stack, so redefining an operator (even as a recursive procedure), profiling it or underflowing
+# behaves exactly as if nothing had been fused.
+_FUSABLE = {
+    "add": operator.add,
+    "sub": operator.sub,
+    "mul": operator.mul,
+    "eq":  operator.eq,
+    "ne":  operator.ne,
+    "ge":  operator.ge,
+    "gt":  operator.gt,
+    "le":  operator.le,
+    "lt":  operator.lt,
+}
+_DUP = Name.of("dup")
+_EXCH = Name.of("exch")
+
+class _Fused:
+    def __init__(self, first, second):
+        self.fallback = (first, second)
+        self.name = second[1]
+        self.builtin = operations[self.name.text]
+        self.fn = _FUSABLE[self.name.text]
+        # (name, builtin) pairs the fast path relies on
+        self.guards = ((first[1], operations[first[1].text]),) if first[0] == parser.NAME else ()
+        self.guards += ((self.name, self.builtin),)
+
+    def bind(self, fallback):
+        # copy without the name checks, for a body whose names bind has replaced by these builtins
+        bound = object.__new__(self.bound_class)
+        bound.__dict__.update(self.__dict__)
+        bound.fallback = tuple(fallback)
+        return bound
+
+    def __repr__(self):
+        return " ".join(str(operand) for _, operand in self.fallback)
+
+class _LiteralThen(_Fused):
+    # `1 add`, `2 mul`, ...: combines the top of the stack with a number literal
+    def __init__(self, first, second):
+        super().__init__(first, second)
+        self.literal = first[1]
+
+    def __call__(self, interp):
+        op_stack = interp.op_stack
+        if op_stack and interp.name_cache.get(self.name) is self.builtin:
+            interp.cache_hits += 1
+            op_stack[-1] = self.fn(op_stack[-1], self.literal)
+        else:
+            interp.push_procedure(self.fallback)
+
+class _DupThen(_Fused):
+    # `dup mul`, ...: combines the top of the stack with itself
+    def __call__(self, interp):
+        op_stack = interp.op_stack
+        cache = interp.name_cache
+        if op_stack and cache.get(_DUP) is dup_operation and cache.get(self.name) is self.builtin:
+            interp.cache_hits += 2
+            op_stack[-1] = self.fn(op_stack[-1], op_stack[-1])
+        else:
+            interp.push_procedure(self.fallback)
+
+class _ExchThen(_Fused):
+    # `exch sub`, ...: applies the operator with its operands swapped
+    def __call__(self, interp):
+        op_stack = interp.op_stack
+        cache = interp.name_cache
+        if len(op_stack) >= 2 and cache.get(_EXCH) is exch_operation and cache.get(self.name) is self.builtin:
+            interp.cache_hits += 2
+            op2 = op_stack.pop()
+            op_stack[-1] = self.fn(op2, op_stack[-1])
+        else:
+            interp.push_procedure(self.fallback)
+
+class _BoundLiteralThen(_LiteralThen):
+    def __call__(self, interp):
+        op_stack = interp.op_stack
+        if op_stack:
+            op_stack[-1] = self.fn(op_stack[-1], self.literal)
+        else:
+            interp.push_procedure(self.fallback)
+
+class _BoundDupThen(_DupThen):
+    def __call__(self, interp):
+        op_stack = interp.op_stack
+        if op_stack:
+            op_stack[-1] = self.fn(op_stack[-1], op_stack[-1])
+        else:
+            interp.push_procedure(self.fallback)
+
+class _BoundExchThen(_ExchThen):
+    def __call__(self, interp):
+        op_stack = interp.op_stack
+        if len(op_stack) >= 2:
+            op2 = op_stack.pop()
+            op_stack[-1] = self.fn(op2, op_stack[-1])
+        else:
+            interp.push_procedure(self.fallback)
+
+_LiteralThen.bound_class = _BoundLiteralThen
+_DupThen.bound_class = _BoundDupThen
+_ExchThen.bound_class = _BoundExchThen
+
+def superinstruction(first, second):
+    # fused replacement for a pair of compiled instructions, or None
+    opcode, name = second
+    if opcode != parser.NAME or name.text not in _FUSABLE:
+        return None
+    opcode, operand = first
+    if opcode == parser.PUSH and type(operand) in (int, float):
+        return _LiteralThen(first, second)
+    if opcode == parser.NAME and operand is _DUP:
+        return _DupThen(first, second)
+    if opcode == parser.NAME and operand is _EXCH:
+        return _ExchThen(first, second)
+    return None
+
+_BUILTIN_NAMES = {fn: Name.of(name) for name, fn in operations.items()}
+
+def bound_superinstruction(first, second):
+    # bound fused replacement for a pair bind has already resolved, or None
+    if second[0] != parser.OPERATOR or second[1] not in _BUILTIN_NAMES:
+        return None
+    named = first
+    if first[0] == parser.OPERATOR:
+        if first[1] not in _BUILTIN_NAMES:
+            return None
+        named = (parser.NAME, _BUILTIN_NAMES[first[1]])
+    fused = superinstruction(named, (parser.NAME, _BUILTIN_NAMES[second[1]]))
+    return None if fused is None else fused.bind((first, second))
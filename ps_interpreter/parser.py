@@ -1,17 +1,16 @@
-import logging
+import re
 import ps_interpreter.core as core
-from ps_interpreter.core import CodeBlock, op_stack, dict_stack, ParseFailed, TypeMismatch
+import ps_interpreter.operations as operations # only used at call time: operations imports this module too
+from ps_interpreter.core import CodeBlock, ParseFailed
 
 
 # PARSER FUNCTIONS ---------------------------------------------------------------
 def process_string(input):
-    logging.debug(f"Input to process string: {input}")
     if len(input) >= 2 and input.startswith("(") and input.endswith(")"):
-        return input[1:-1]
+        return core.PSString.of(input[1:-1])
     raise ParseFailed("can't parse this into a string")
 
 def process_boolean(input):
-    logging.debug(f"Input to process boolean: {input}")
     if input == "true":
         return True
     elif input == "false":
@@ -20,7 +19,8 @@ def process_boolean(input):
         raise ParseFailed("can't parse it into boolean")
     
 def process_number(input):
-    logging.debug(f"Input to process number: {input}")
+    if input.isdigit():
+        return int(input)
     try:
         float_value = float(input)
         if float_value.is_integer():
@@ -31,92 +31,109 @@ def process_number(input):
         raise ParseFailed("can't parse this into a number")
     
 def process_code_block(input):
-    logging.debug(f"Input to process code block: {input}")
     if len(input) >= 2 and input.startswith("{") and input.endswith("}"):
-        toks = input[1:-1].strip().split()
-        # capture current dict‐stack for lexical scoping later
-        env_snapshot = dict_stack.copy()
-        # return the CodeBlock, let process_constants append it
-        return CodeBlock(toks, env_snapshot)
+        toks = core.tokenize(input[1:-1])
+        # the interpreter wraps the compiled body in a CodeBlock when it is pushed,
+        # capturing the dict stack of that moment for lexical scoping
+        return toks, compile_tokens(toks)
     else:
         raise ParseFailed("can't parse this into a code block")
 
 def process_name_constant(input):
-    logging.debug(f"Input to process name constant: {input}")
     if input.startswith("/"):
-        return input
+        return core.Name.of(input[1:], executable=False)
     else:
         raise ParseFailed("Can't parse into name constant")
     
 def process_array(input):
-    logging.debug(f"Input to process array: {input}")
     if len(input) >= 2 and input.startswith("[") and input.endswith("]"):
-        inner = input[1:-1].strip()
-        if not inner:
-            return []
-        return inner.split()
+        # all integers or all reals are stored unboxed
+        return core.NumericArray.of(map(_element, core.tokenize(input[1:-1])))
     raise ParseFailed("can't parse this into an array")
 
+def _element(token):
+    # the value an array literal holds for one of its tokens: a number, boolean, string, array,
+    # literal or executable name, or a procedure (a CodeBlock with no environment)
+    parser = classify(token)
+    if parser is None:
+        return core.Name.of(token)
+    if parser is process_code_block:
+        toks, body = parser(token)
+        return CodeBlock(toks, None, body)
+    return parser(token)
 
-PARSERS = [
-    process_string,
-    process_boolean,
-    process_number,
-    process_code_block,
-    process_name_constant,
-    process_array
-]
-
-
-def process_constants(input):
-    for parser in PARSERS:
-        try:
-            res = parser(input)
-            op_stack.append(res)
-            return
-        except ParseFailed as e:
-            logging.debug(e)
-            continue
-    raise ParseFailed(f"Not a literal: {input}")
-
-def lookup_in_dictionary(token):
-    # 1) find value via dynamic lookup
-    for d in reversed(dict_stack):
-        if token in d:
-            value = d[token]
-            break
-    else:
-        raise ParseFailed(f"Undefined token: {token}")
-
-    # 2) callable?
-    if callable(value):
-        return value()
-
-    # 3) code block?
-    if isinstance(value, CodeBlock):
-        if core.lexical_scoping:
-            # swap in the block’s env
-            old_stack = dict_stack[:] 
-            dict_stack[:] = [d.copy() for d in value.env]
-            for t in value.tokens:
-                process_input(t)
-            dict_stack[:] = old_stack
-        else:
-            # dynamic
-            for t in value.tokens:
-                process_input(t)
-        return
 
-    # 4) literal
-    op_stack.append(value)
+# CLASSIFIER ---------------------------------------------------------------------
+# signed integers, decimals and exponents; anything else float() would take (inf, nan, 1_000) is a name
+_NUMBER_RE = re.compile(r'[+-]?(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?\Z')
+
+def classify(input):
+    # picks the constructor for a literal from its first character, or None for an executable name
+    first = input[:1]
+    if first == "(":
+        if len(input) >= 2 and input.endswith(")"):
+            return process_string
+    elif first == "{":
+        if len(input) >= 2 and input.endswith("}"):
+            return process_code_block
+    elif first == "[":
+        if len(input) >= 2 and input.endswith("]"):
+            return process_array
+    elif first == "/":
+        return process_name_constant
+    elif input == "true" or input == "false":
+        return process_boolean
+    elif _NUMBER_RE.match(input):
+        return process_number
+    return None
+
+# COMPILER -----------------------------------------------------------------------
+# a code block body is compiled once into a list of (opcode, operand) pairs
+PUSH  = 0 # push a literal value
+NAME  = 1 # look up a name and execute whatever it is bound to
+PROC  = 2 # push a new CodeBlock for a nested procedure body
+ARRAY = 3 # push a fresh copy of an array or string literal
+FUSED = 4 # call a superinstruction standing in for two instructions (see operations.superinstruction)
+CALL  = 5 # run a CodeBlock or compiled procedure; emitted by loop operators, not by the compiler
+OPERATOR = 6 # call an operator directly; put in place of its name by bind, not by the compiler
+
+_OPCODES = {process_code_block: PROC, process_array: ARRAY, process_string: ARRAY}
+
+def compile_token(token):
+    parser = classify(token)
+    if parser is None:
+        return (NAME, core.Name.of(token))
+    return (_OPCODES.get(parser, PUSH), parser(token))
+
+def compile_value(value):
+    # an element of an array run as a procedure: executable names are looked up, strings and
+    # arrays are copied when pushed as literals are, anything else (a procedure too) is pushed
+    if type(value) is core.Name and value.executable:
+        return (NAME, value)
+    if isinstance(value, (core.PSString, core.NumericArray, list)):
+        return (ARRAY, value)
+    return (PUSH, value)
+
+def compile_tokens(tokens):
+    instructions = []
+    for t in tokens:
+        # tokens of a procedure body, or the elements of an array run as one
+        instruction = compile_token(t) if type(t) is str else compile_value(t)
+        if instructions:
+            fused = operations.superinstruction(instructions[-1], instruction)
+            if fused is not None:
+                instructions[-1] = (FUSED, fused)
+                continue
+        instructions.append(instruction)
+    return instructions
+
+def compile_procedure(proc):
+    # arrays are compiled here; CodeBlocks were compiled at creation
+    if isinstance(proc, CodeBlock):
+        return proc
+    return compile_tokens(proc)
 
 
 def process_input(token):
-    try:
-        process_constants(token)
-    except ParseFailed as e:
-        logging.debug(e)
-        try:
-            lookup_in_dictionary(token)
-        except Exception as e:
-            logging.error(e)
\ No newline at end of file
+    # runs one token on the default interpreter (core.op_stack / core.dict_stack)
+    core.default_interpreter().process_input(token)
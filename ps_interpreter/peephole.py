@@ -0,0 +1,111 @@
+"""
+Peephole optimizer for bound procedure bodies, enabled by --opt-level (Interpreter(opt_level=N)).
+
+It only rewrites OPERATOR instructions, which bind put in place of operator names: they hold the
+builtin itself, so nothing the program defines later can change what they do, under dynamic
+scoping or otherwise. Names that were not bound are left alone. The rewrites are
+
+    2 3 mul            -> 6         pure arithmetic and comparisons on literals
+    exch exch, dup pop -> nothing   and a literal followed by pop
+    true { ... } if    -> ...       a literal-condition if / ifelse runs its branch inline
+
+An operator that would fail on its literal operands (1 0 div) is kept, so the error still
+happens when the procedure runs. Removed sequences no longer check the stack depth, so
+`exch exch` on a short stack stops raising stackunderflow.
+"""
+from ps_interpreter.parser import PUSH, PROC, FUSED, NAME, OPERATOR
+from ps_interpreter.operations import operations, bound_superinstruction
+
+_PURE = {operations[name] for name in (
+    "add", "sub", "mul", "div", "idiv", "mod", "abs", "neg", "ceiling", "floor", "round", "sqrt",
+    "eq", "ne", "ge", "gt", "le", "lt", "and", "or", "not",
+)}
+_ARITY = {fn: 1 for fn in (operations[name] for name in (
+    "abs", "neg", "ceiling", "floor", "round", "sqrt", "not"))}
+_LITERAL = (int, float, bool)
+_EXCH, _DUP, _POP = operations["exch"], operations["dup"], operations["pop"]
+_IF, _IFELSE = operations["if"], operations["ifelse"]
+_FAILED = object()
+
+
+class _Scratch:
+    # just enough interpreter for a pure operator
+    def __init__(self, op_stack):
+        self.op_stack = op_stack
+
+def _evaluate(fn, operands):
+    # the literal fn leaves on a stack holding operands, or _FAILED
+    scratch = _Scratch(list(operands))
+    try:
+        fn(scratch)
+    except Exception:
+        return _FAILED
+    if len(scratch.op_stack) != 1 or type(scratch.op_stack[0]) not in _LITERAL:
+        return _FAILED
+    return scratch.op_stack[0]
+
+def _literal(instruction):
+    return instruction[0] == PUSH and type(instruction[1]) in _LITERAL
+
+def _reduce(out, inline):
+    # applies rewrites at the end of out until none fits
+    while out and out[-1][0] == OPERATOR:
+        fn = out[-1][1]
+        if fn in _PURE:
+            arity = _ARITY.get(fn, 2)
+            operands = out[-arity - 1:-1]
+            if len(operands) == arity and all(map(_literal, operands)):
+                value = _evaluate(fn, [operand for _, operand in operands])
+                if value is not _FAILED:
+                    out[-arity - 1:] = [(PUSH, value)]
+                    continue
+        elif len(out) >= 2:
+            previous = out[-2]
+            if (fn is _EXCH and previous == (OPERATOR, _EXCH) or
+                    fn is _POP and (previous == (OPERATOR, _DUP) or previous[0] == PUSH)):
+                del out[-2:]
+                continue
+            if inline and fn is _IF and len(out) >= 3:
+                cond, proc = out[-3], out[-2]
+                if type(cond[1]) is bool and cond[0] == PUSH and proc[0] == PROC:
+                    del out[-3:]
+                    if cond[1]:
+                        out.extend(proc[1][1])
+                    continue
+            if inline and fn is _IFELSE and len(out) >= 4:
+                cond, proc1, proc2 = out[-4], out[-3], out[-2]
+                if type(cond[1]) is bool and cond[0] == PUSH and proc1[0] == proc2[0] == PROC:
+                    del out[-4:]
+                    out.extend((proc1 if cond[1] else proc2)[1][1])
+                    continue
+        break
+
+def _fuse(instructions):
+    # fuses bound pairs again, left to right as the compiler does
+    fused = []
+    for instruction in instructions:
+        if fused:
+            pair = bound_superinstruction(fused[-1], instruction)
+            if pair is not None:
+                fused[-1] = (FUSED, pair)
+                continue
+        fused.append(instruction)
+    return fused
+
+def optimize(instructions, inline=True):
+    # optimized copy of a bound body, nested procedures included; inline is off in lexical mode,
+    # where a branch must run in the environment its procedure captured
+    out = []
+    for instruction in instructions:
+        opcode, operand = instruction
+        if opcode == FUSED and all(op != NAME for op, _ in operand.fallback):
+            pending = operand.fallback # bound pair, rewritten one instruction at a time
+        elif opcode == PROC:
+            toks, body = operand
+            pending = ((PROC, (toks, optimize(body, inline))),)
+        else:
+            pending = (instruction,)
+        for instruction in pending:
+            out.append(instruction)
+            _reduce(out, inline)
+    return _fuse(out)
@@ -0,0 +1,169 @@
+"""
+Opt-in profiler: call counts, cumulative and self time, and operand-stack high-water marks
+for every operator and every named procedure.
+
+Enabling swaps instrumented wrappers into the interpreter's operator table and a copy of
+its systemdict, and hooks that one instance's frames: push_code_block times each procedure's
+frame from its first instruction until the execution stack drops it, and every frame swaps
+the operators bind put into bound bodies for their instrumented wrappers. Procedures keep
+running on the execution stack, so deep recursion profiles as it runs. Fused pairs and
+JIT-compiled procedures run as the instructions they stand for while profiling, so each
+operator in them is counted. Disabling puts the originals back, so an interpreter that is not
+being profiled runs exactly the same code as before.
+"""
+import json
+import time
+from ps_interpreter.core import Name
+from ps_interpreter.parser import FUSED, OPERATOR
+from ps_interpreter.operations import operations, unchecked
+
+
+class CallStats:
+    def __init__(self, name, kind):
+        self.name = name
+        self.kind = kind        # "operator" or "procedure"
+        self.calls = 0
+        self.total = 0.0        # seconds including everything called from inside
+        self.self_time = 0.0    # seconds excluding profiled callees
+        self.max_stack = 0      # deepest operand stack seen on entry or exit
+
+    def to_dict(self):
+        return {
+            "name": self.name,
+            "kind": self.kind,
+            "calls": self.calls,
+            "total_ms": round(self.total * 1000, 3),
+            "self_ms": round(self.self_time * 1000, 3),
+            "max_stack": self.max_stack,
+        }
+
+
+class Profiler:
+    def __init__(self, interp):
+        self.interp = interp
+        self.stats = {}     # (kind, name) -> CallStats
+        self._frames = []   # child time accumulated by each active call
+        self._originals = None
+        self._systemdict = None
+
+    @property
+    def enabled(self):
+        return self._originals is not None
+
+    def enable(self):
+        if self.enabled:
+            return
+        interp = self.interp
+        self._originals = interp.operators
+        wrapped = {name: self._wrap(name, fn) for name, fn in interp.operators.items()}
+        interp.operators = wrapped
+        # systemdict may be shared with other interpreters, so the wrappers go into a copy
+        self._systemdict = interp.dict_stack[0]
+        interp.dict_stack[0] = systemdict = type(self._systemdict)(self._systemdict)
+        for name, fn in self._originals.items():
+            key = Name.of(name)
+            if systemdict.get(key) is fn:
+                systemdict[key] = wrapped[name]
+        # bound bodies call the builtins directly, their unchecked variants included
+        self._bound = {operations[name]: wrapped[name] for name in operations if name in wrapped}
+        self._bound.update((fn, self._wrap(name, fn)) for name, fn in unchecked.items())
+        frame = interp.frame
+        interp.frame = lambda instructions: frame(self._instructions(instructions))
+        interp.push_code_block = self._push_code_block
+        interp.name_cache.clear() # it may still hold the unwrapped operators
+
+    def disable(self):
+        if not self.enabled:
+            return
+        interp = self.interp
+        interp.dict_stack[0] = self._systemdict
+        interp.operators = self._originals
+        del interp.frame, interp.push_code_block
+        interp.name_cache.clear()
+        self._originals = None
+
+    # instrumentation ----------------------------------------------------------------------------------
+    def _stats(self, kind, name):
+        stats = self.stats.get((kind, name))
+        if stats is None:
+            stats = self.stats[(kind, name)] = CallStats(name, kind)
+        return stats
+
+    def _enter(self):
+        # starts timing a call; returns what _exit needs
+        self._frames.append(0.0)
+        return time.perf_counter(), len(self.interp.op_stack)
+
+    def _exit(self, stats, entry):
+        start, depth = entry
+        elapsed = time.perf_counter() - start
+        frames = self._frames
+        children = frames.pop()
+        if frames:
+            frames[-1] += elapsed
+        stats.calls += 1
+        stats.total += elapsed
+        stats.self_time += elapsed - children
+        depth = max(depth, len(self.interp.op_stack))
+        if depth > stats.max_stack:
+            stats.max_stack = depth
+
+    def _wrap(self, name, fn):
+        # operators return as soon as they have run or scheduled their procedure
+        stats = self._stats("operator", name)
+        def profiled(interp):
+            entry = self._enter()
+            try:
+                return fn(interp)
+            finally:
+                self._exit(stats, entry)
+        return profiled
+
+    def _instructions(self, instructions):
+        # a frame's instructions with bound operators instrumented and fused pairs taken apart
+        bound = self._bound
+        instructions = iter(instructions)
+        try:
+            for instruction in instructions:
+                opcode, operand = instruction
+                if opcode == OPERATOR:
+                    instruction = (OPERATOR, bound.get(operand, operand))
+                elif opcode == FUSED:
+                    yield from self._instructions(operand.fallback)
+                    continue
+                yield instruction
+        finally:
+            close = getattr(instructions, "close", None)
+            if close is not None: # a lexical frame restores the dictionary stack
+                close()
+
+    def _push_code_block(self, block):
+        # the interpreted call, whatever the JIT compiled, with the frame it pushes timed
+        interp = self.interp
+        interp._push_code_block(block)
+        exec_stack = interp.exec_stack
+        exec_stack[-1] = self._timed(self._stats("procedure", block.name or "<anonymous>"), exec_stack[-1])
+
+    def _timed(self, stats, frame):
+        # a procedure's frame, timed from its first instruction until it finishes or is unwound
+        entry = self._enter()
+        try:
+            yield from frame
+        finally:
+            self._exit(stats, entry)
+
+    # reporting ----------------------------------------------------------------------------------------
+    def results(self):
+        # called entries only, most self time first
+        called = [s for s in self.stats.values() if s.calls]
+        return sorted(called, key=lambda s: s.self_time, reverse=True)
+
+    def report(self, format="table"):
+        rows = [s.to_dict() for s in self.results()]
+        if format == "json":
+            return json.dumps(rows, indent=2)
+        lines = [f"{'name':<20}{'kind':<11}{'calls':>10}{'total ms':>12}{'self ms':>12}{'max stack':>11}"]
+        for r in rows:
+            lines.append(f"{r['name']:<20}{r['kind']:<11}{r['calls']:>10}"
+                         f"{r['total_ms']:>12.3f}{r['self_ms']:>12.3f}{r['max_stack']:>11}")
+        return "\n".join(lines)
@@ -0,0 +1,224 @@
+"""
+Interpreter server: accepts PostScript programs over TCP or a Unix socket and runs them on a
+process pool of warm interpreters.
+
+    python -m ps_interpreter serve [--host H] [--port P | --unix PATH] [--workers N]
+                                   [--timeout S] [--max-pending N] [--max-request B] [--lexical]
+
+The protocol is one JSON object per line. A request {"id": 1, "source": "1 2 add ="} gets one
+response line with the same id and the program's status, output, stack, error and elapsed time
+(see jobs.JobResult); "timeout" may ask for a shorter limit than the server's. {"stats": true}
+returns the server's throughput and latency counters instead. A request that is not valid JSON,
+has fields of the wrong type, or is longer than max_request bytes gets status "error" and the
+connection carries on with the next line.
+
+Backpressure: at most max_pending programs are queued or running at once, and any request
+beyond that is answered straight away with status "busy". Each connection handles its requests
+in order, so a client that sends faster than it reads is held back by the socket itself.
+"""
+import os
+import sys
+import json
+import math
+import time
+import asyncio
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from ps_interpreter import jobs
+from ps_interpreter.interpreter import MAX_STACK
+
+_GRACE = 1.0 # seconds a worker gets past the timeout to report it before the server gives up
+MAX_REQUEST = 16 * 1024 * 1024 # bytes in one request line
+
+
+def _error(message, request_id=None):
+    response = {"status": "error", "error": message}
+    if request_id is not None:
+        response["id"] = request_id
+    return response
+
+
+class ServerStats:
+    def __init__(self):
+        self.started = time.monotonic()
+        self.requests = 0       # programs received
+        self.completed = 0      # programs that got a result, whatever its status
+        self.errors = 0
+        self.timeouts = 0
+        self.rejected = 0       # answered "busy"
+        self.in_flight = 0      # queued or running right now
+        self.latency_total = 0.0 # seconds from request to result, over completed programs
+        self.latency_max = 0.0
+
+    def record(self, result, latency):
+        self.completed += 1
+        self.errors += result.status == "error"
+        self.timeouts += result.status == "timeout"
+        self.latency_total += latency
+        self.latency_max = max(self.latency_max, latency)
+
+    def to_dict(self):
+        uptime = time.monotonic() - self.started
+        return {
+            "uptime": round(uptime, 3),
+            "requests": self.requests,
+            "completed": self.completed,
+            "errors": self.errors,
+            "timeouts": self.timeouts,
+            "rejected": self.rejected,
+            "in_flight": self.in_flight,
+            "throughput": round(self.completed / uptime, 3) if uptime else 0.0, # programs per second
+            "latency_avg_ms": round(self.latency_total / self.completed * 1000, 3) if self.completed else 0.0,
+            "latency_max_ms": round(self.latency_max * 1000, 3),
+        }
+
+
+class Server:
+    def __init__(self, workers=None, timeout=None, max_pending=None, lexical=False, max_stack=MAX_STACK,
+                 max_request=MAX_REQUEST):
+        self.workers = workers or os.cpu_count() or 1
+        self.timeout = timeout          # per-program limit in seconds, None for none
+        self.max_pending = max_pending or self.workers * 4
+        self.max_request = max_request  # longest request line accepted, in bytes
+        self.stats = ServerStats()
+        self._pool = ProcessPoolExecutor(max_workers=self.workers, initializer=jobs._init_worker,
+                                         initargs=(lexical, max_stack))
+        self._server = None
+
+    # running programs ---------------------------------------------------------------------------------
+    async def run_program(self, source, timeout=None, name="<request>"):
+        # runs one program on the pool; returns its JobResult
+        stats = self.stats
+        stats.requests += 1
+        if stats.in_flight >= self.max_pending:
+            stats.rejected += 1
+            return jobs.JobResult(name, "busy", "", [], "Server busy, try again later.", 0.0)
+        if self.timeout is not None:
+            timeout = self.timeout if timeout is None else min(timeout, self.timeout)
+        loop = asyncio.get_running_loop()
+        stats.in_flight += 1
+        start = time.perf_counter()
+        try:
+            future = loop.run_in_executor(self._pool, jobs._run_source, (name, source, timeout))
+            result = await asyncio.wait_for(future, None if timeout is None else timeout + _GRACE)
+        except asyncio.TimeoutError: # the worker did not even get to report its own timeout
+            result = jobs.JobResult(name, "timeout", "", [], f"Timed out after {timeout}s.", timeout)
+        finally:
+            stats.in_flight -= 1
+        stats.record(result, time.perf_counter() - start)
+        return result
+
+    async def _respond(self, line):
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise ValueError
+        except ValueError:
+            return _error("Each request must be one JSON object per line.")
+        if request.get("stats"):
+            return self.stats.to_dict()
+        source, timeout = request.get("source", ""), request.get("timeout")
+        if not isinstance(source, str):
+            return _error('"source" must be a string.', request.get("id"))
+        if timeout is not None and (type(timeout) not in (int, float) or not 0 < timeout < math.inf):
+            return _error('"timeout" must be a positive number of seconds.', request.get("id"))
+        result = await self.run_program(source, timeout)
+        response = result.to_dict()
+        response["id"] = request.get("id")
+        return response
+
+    async def _read_request(self, reader):
+        # the next request line, b"" at the end of the stream, or None when it was too long to read
+        try:
+            return await reader.readuntil(b"\n")
+        except asyncio.IncompleteReadError as e: # the last line had no newline
+            return e.partial
+        except asyncio.LimitOverrunError as e:
+            consumed = e.consumed
+        while True: # drop the rest of the line, a buffer at a time
+            await reader.readexactly(consumed)
+            try:
+                await reader.readuntil(b"\n")
+                return None
+            except asyncio.IncompleteReadError:
+                return None
+            except asyncio.LimitOverrunError as e:
+                consumed = e.consumed
+
+    async def handle(self, reader, writer):
+        # one connection: requests are answered in the order they arrive
+        try:
+            while True:
+                line = await self._read_request(reader)
+                if line is None:
+                    response = _error(f"Requests are limited to {self.max_request} bytes.")
+                elif not line:
+                    break
+                elif not line.strip():
+                    continue
+                else:
+                    try:
+                        response = await self._respond(line)
+                    except Exception as e:
+                        response = _error(f"{type(e).__name__}: {e}")
+                writer.write(json.dumps(response).encode() + b"\n")
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    # lifecycle ----------------------------------------------------------------------------------------
+    async def start(self, host="127.0.0.1", port=0, path=None):
+        # listens on a Unix socket when path is given, TCP otherwise; returns the bound address
+        loop = asyncio.get_running_loop()
+        # start every worker now, so no request pays for process startup and imports
+        warm = [loop.run_in_executor(self._pool, jobs._run_source, ("<warmup>", "", None))
+                for _ in range(self.workers)]
+        await asyncio.gather(*warm)
+        if path is not None:
+            self._server = await asyncio.start_unix_server(self.handle, path, limit=self.max_request)
+        else:
+            self._server = await asyncio.start_server(self.handle, host, port, limit=self.max_request)
+        return self._server.sockets[0].getsockname()
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        self._pool.shutdown(cancel_futures=True)
+
+    async def serve_forever(self):
+        await self._server.serve_forever()
+
+
+# command line ----------------------------------------------------------------------------------------
+async def _serve(args):
+    server = Server(workers=args.workers, timeout=args.timeout, max_pending=args.max_pending,
+                    lexical=args.lexical, max_request=args.max_request)
+    address = await server.start(args.host, args.port, args.unix)
+    print(f"Serving on {address}", file=sys.stderr)
+    try:
+        await server.serve_forever()
+    finally:
+        await server.close()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m ps_interpreter serve",
+        description="Serve PostScript programs over TCP or a Unix socket"
+    )
+    parser.add_argument("--host", default="127.0.0.1", help="Address to listen on.")
+    parser.add_argument("--port", type=int, default=8765, help="TCP port to listen on.")
+    parser.add_argument("--unix", help="Listen on this Unix socket path instead of TCP.")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count).")
+    parser.add_argument("--timeout", type=float, default=None, help="Per-program time limit in seconds.")
+    parser.add_argument("--max-pending", type=int, default=None, help="Programs queued or running before requests are rejected as busy (default: 4 per worker).")
+    parser.add_argument("--max-request", type=int, default=MAX_REQUEST, help="Longest request line accepted, in bytes (default: 16 MiB).")
+    parser.add_argument("--lexical", action="store_true", help="Use lexical scoping instead of dynamic.")
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(_serve(args))
+    except KeyboardInterrupt:
+        pass
+    return 0
@@ -0,0 +1,86 @@
+"""
+Cooperative time-slicing: run a program a slice at a time and resume it later.
+
+    execution = interp.start(source)
+    while not execution.resume(instructions=50000):
+        ...                         # run something else, then come back
+
+A slice ends at the first budget checkpoint (every Interpreter.check_interval instructions)
+after its instruction or time allowance is used up: the checkpoint sets interp.pausing, and the
+dispatch loop stops at its next switch between frames. Procedures run on the interpreter's
+explicit execution stack, so a paused program is just the frames left on it plus the tokens not
+read yet; resume() carries on dispatching them. Nothing runs between slices, and an execution
+that is never finished holds no thread or Python stack.
+"""
+import time
+from ps_interpreter.core import iter_tokens
+from ps_interpreter.parser import compile_token
+
+
+class Execution:
+    def __init__(self, interp, source):
+        self.interp = interp
+        self.done = False
+        self.error = None       # exception that ended the program, also raised by resume()
+        self._source = source
+        self._tokens = None     # the program's tokens, read as slices need them
+        self._slice_left = None # instructions left in the current slice
+        self._slice_deadline = None
+        self._paused = None     # when the last slice ended
+
+    def resume(self, instructions=None, seconds=None):
+        # runs the next slice; returns True once the program has finished
+        if self.done:
+            return True
+        interp = self.interp
+        self._slice_left = instructions
+        self._slice_deadline = None if seconds is None else time.monotonic() + seconds
+        if self._tokens is None:
+            interp.start_budget()
+            self._tokens = iter_tokens(self._source)
+        elif interp.deadline is not None: # max_seconds only counts time spent running
+            interp.deadline += time.monotonic() - self._paused
+        interp.execution = self
+        interp.pausing = False
+        try:
+            self.done = self._run()
+        except Exception as e:
+            self.error = e
+            self.done = True
+            raise
+        finally:
+            interp.execution = None
+            interp.pausing = False
+            self._paused = time.monotonic()
+        return self.done
+
+    def cancel(self):
+        # abandons the program, dropping whatever it left on the execution stack
+        if not self.done:
+            self.interp._unwind(0)
+            self.done = True
+
+    def _run(self):
+        # dispatches until the slice ends (False) or the program does (True), checked as Interpreter.run
+        interp = self.interp
+        exec_stack, op_stack = interp.exec_stack, interp.op_stack
+        if exec_stack and interp._run(0): # the token the last slice stopped in
+            return False
+        for tok in self._tokens:
+            if tok == "quit":
+                break
+            interp._countdown -= 1
+            if interp._countdown < 0 or len(op_stack) > interp.peak_depth:
+                interp.checkpoint()
+            exec_stack.append(interp.frame((compile_token(tok),)))
+            if interp._run(0) or interp.pausing:
+                return False
+        return True
+
+    def checkpoint(self, executed):
+        # called by Interpreter.checkpoint; asks the dispatch loop to stop once the slice is used up
+        if self._slice_left is not None:
+            self._slice_left -= executed
+        if (self._slice_left is not None and self._slice_left <= 0 or
+                self._slice_deadline is not None and time.monotonic() >= self._slice_deadline):
+            self.interp.pausing = True
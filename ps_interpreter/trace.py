@@ -0,0 +1,56 @@
+"""
+Traced executor for --trace: logs every instruction and the operand stack before it runs.
+
+Tracing lives in this subclass, which wraps every execution stack frame in a logging
+generator, so the default dispatch loop does no logging work at all.
+"""
+import logging
+from ps_interpreter.interpreter import Interpreter
+from ps_interpreter.parser import NAME, PROC, FUSED, CALL, OPERATOR
+from ps_interpreter.operations import operations, unchecked
+
+logger = logging.getLogger("ps_interpreter.trace")
+_OPERATOR_NAMES = {fn: name for name, fn in operations.items()}
+_OPERATOR_NAMES.update((fn, name) for name, fn in unchecked.items())
+
+def _literal(value):
+    # a value as a program would write it: names, strings, procedures and arrays in their own syntax
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if type(value) is list:
+        return "[" + " ".join(map(_literal, value)) + "]"
+    return repr(value)
+
+def describe(instruction):
+    opcode, operand = instruction
+    if opcode == NAME:
+        return operand.text
+    if opcode == OPERATOR: # bound by bind
+        return "--" + _OPERATOR_NAMES.get(operand, operand.__name__) + "--"
+    if opcode == PROC:
+        return "{" + " ".join(operand[0]) + "}"
+    return _literal(operand) # PUSH, or ARRAY of a string or array
+
+
+class TracingInterpreter(Interpreter):
+    def frame(self, instructions):
+        # every frame on the execution stack logs each instruction as the dispatch loop fetches it
+        instructions = iter(instructions)
+        try:
+            for instruction in instructions:
+                opcode, operand = instruction
+                if opcode == FUSED: # traced as the two instructions it stands for
+                    yield from self.frame(operand.fallback)
+                    continue
+                if opcode != CALL: # a loop running its body, which traces itself
+                    logger.debug("%-20s %r", describe(instruction), self.op_stack)
+                yield instruction
+        finally:
+            close = getattr(instructions, "close", None)
+            if close is not None: # a lexical frame restores the dictionary stack
+                close()
+
+def enable_trace_output():
+    # the root logger only shows errors, so trace records need their own level
+    logging.basicConfig(level = logging.ERROR)
+    logger.setLevel(logging.DEBUG)
@@ -0,0 +1,73 @@
+import pytest
+from ps_interpreter.core import Name, StackUnderflow, TypeMismatch
+from ps_interpreter.interpreter import Interpreter
+from ps_interpreter.parser import PROC, OPERATOR
+from ps_interpreter.operations import operations, unchecked
+from ps_interpreter.analysis import analyze, effect, report, main
+
+def block(interp, name):
+    return interp.dict_stack[1][Name.of(name)]
+
+def operators(instructions):
+    return [operand for opcode, operand in instructions if opcode == OPERATOR]
+
+def test_proven_operators_run_unchecked():
+    interp = Interpreter(opt_level=1)
+    interp.run(["/norm { dup mul exch dup mul add sqrt } bind def 3 4 norm"])
+    assert operators(block(interp, "norm").instructions) == [
+        operations["exch"], unchecked["add"], unchecked["sqrt"]]
+    assert interp.op_stack == [5.0]
+    assert effect(analyze(block(interp, "norm"))) == "any any -> real"
+
+def test_unproven_operators_keep_their_checks():
+    interp = Interpreter(opt_level=1)
+    interp.run(["/f { exch } bind def /g { 1 idiv } bind def /h { 1 0 idiv } bind def"])
+    assert operators(block(interp, "g").instructions) == [operations["idiv"]]
+    with pytest.raises(StackUnderflow):
+        interp.run(["f"])
+    with pytest.raises(TypeMismatch):
+        interp.run(["(a) g"])
+    interp.op_stack.clear()
+    with pytest.raises(ValueError): # the unchecked idiv still refuses a zero divisor
+        interp.run(["h"])
+    assert operators(block(interp, "h").instructions) == [unchecked["idiv"]]
+    assert interp.op_stack == []
+
+def test_types_flow_into_control_flow_and_loop_bodies():
+    interp = Interpreter(opt_level=1)
+    interp.run(["/f { 0 1 1 10 { dup neg add add } for 0 gt { 1 } { 2 } ifelse } bind def f"])
+    instructions = block(interp, "f").instructions
+    assert unchecked["for"] in operators(instructions)
+    assert unchecked["ifelse"] in operators(instructions)
+    body = next(operand[1] for opcode, operand in instructions if opcode == PROC)
+    assert operators(body) == [unchecked["dup"], unchecked["neg"], unchecked["add"], operations["add"]]
+    assert interp.op_stack == [2]
+
+def test_names_that_may_be_procedures_end_what_is_known():
+    interp = Interpreter(opt_level=1)
+    interp.run(["/x { pop pop } def /f { 1 2 x exch } bind def"])
+    assert operators(block(interp, "f").instructions) == [operations["exch"]]
+    assert effect(analyze(block(interp, "f"))) == "?"
+    with pytest.raises(StackUnderflow):
+        interp.run(["f"])
+
+def test_report(tmp_path, capsys):
+    interp = Interpreter(opt_level=1)
+    interp.run(["/f { 2 3 4 add exch pop } bind def"])
+    text = report(analyze(block(interp, "f")), "/f")
+    assert text.splitlines()[0] == "/f: -> int"
+    assert "  --exch--                 int int                  unchecked" in text.splitlines()
+    program = tmp_path / "prog.ps"
+    program.write_text("/norm { dup mul exch dup mul add sqrt } def\n")
+    assert main([str(program)]) == 0
+    out = capsys.readouterr().out
+    assert out.startswith("/norm: any any -> real\n") and "--sqrt--" in out
+
+def test_binding_a_specialized_body_again():
+    source = "/f { 1 1 3 { 1 10 { pop } for } for } bind def /g { exch } bind bind def f g"
+    for interp in (Interpreter(opt_level=1, autobind=True), Interpreter(opt_level=2)):
+        interp.op_stack[:] = [1, 2]
+        interp.run([source])
+        assert interp.op_stack == [2, 1]
+        assert unchecked["for"] in operators(block(interp, "f").instructions)
+        assert operators(block(interp, "g").instructions) == [operations["exch"]]
@@ -0,0 +1,68 @@
+import io
+import os
+from ps_interpreter.core import NumericArray
+from ps_interpreter.parser import PROC, ARRAY, FUSED
+from ps_interpreter.interpreter import Interpreter
+from ps_interpreter.bytecode import BytecodeCache, compile_program, encode, decode, MIN_SIZE
+
+PROGRAM = "/sq { dup mul 2 add } def [1 2 3] [1 (a) /b c [2] { 3 }] 3 sq = 4 2 sub (x) print true { 2 } if =\n"
+
+def _run(instructions):
+    out = io.StringIO()
+    interp = Interpreter(output=out)
+    interp.run_compiled(instructions)
+    return out.getvalue(), [repr(x) for x in interp.op_stack]
+
+def test_round_trip_keeps_procedures_arrays_and_fused_pairs():
+    compiled = compile_program(PROGRAM)
+    decoded = decode(encode(compiled))
+    assert [op for op, _ in decoded] == [op for op, _ in compiled]
+    assert any(op == FUSED for op, _ in decoded)
+    assert any(op == PROC for op, _ in decoded)
+    arrays = [operand for op, operand in decoded if op == ARRAY]
+    assert type(arrays[0]) is NumericArray and list(arrays[0]) == [1, 2, 3]
+    assert [type(x).__name__ for x in arrays[1]] == ["int", "PSString", "Name", "Name", "NumericArray", "CodeBlock"]
+    assert _run(decoded) == _run(compile_program(PROGRAM))
+
+def test_second_compile_is_a_hit(tmp_path):
+    text = PROGRAM * (MIN_SIZE // len(PROGRAM) + 1)
+    cache = BytecodeCache(str(tmp_path))
+    first = cache.compile(text)
+    second = BytecodeCache(str(tmp_path))
+    assert _run(second.compile(text)) == _run(first)
+    assert (cache.misses, second.hits) == (1, 1)
+
+def test_small_programs_are_not_cached(tmp_path):
+    BytecodeCache(str(tmp_path)).compile(PROGRAM)
+    assert os.listdir(tmp_path) == []
+
+def test_eviction_drops_least_recently_used(tmp_path):
+    cache = BytecodeCache(str(tmp_path))
+    texts = [f"{i} pop\n" + PROGRAM * (MIN_SIZE // len(PROGRAM) + 1) for i in range(3)]
+    for i, text in enumerate(texts):
+        cache.compile(text)
+        os.utime(cache._path(cache.key(text)), (i, i))
+    sizes = sorted(e.stat().st_size for e in os.scandir(tmp_path))
+    cache.max_bytes = sizes[-1] + sizes[-2]
+    cache.evict()
+    assert cache.load(cache.key(texts[0])) is None
+    assert cache.load(cache.key(texts[2])) is not None
+
+def test_key_follows_the_interpreter_source(tmp_path, monkeypatch):
+    import ps_interpreter.bytecode as bytecode
+    cache = BytecodeCache(str(tmp_path))
+    before = cache.key(PROGRAM)
+    monkeypatch.setattr(bytecode, "_source_hash", "edited")
+    assert cache.key(PROGRAM) != before
+
+def test_batch_uses_the_cache(tmp_path, monkeypatch, capsys):
+    from ps_interpreter.__main__ import run_batch
+    monkeypatch.setenv("PS_INTERPRETER_CACHE", str(tmp_path / "cache"))
+    prog = tmp_path / "prog.ps"
+    prog.write_text("1 pop\n" * (MIN_SIZE // 6 + 1) + "2 3 add =\nquit\n99 =\n")
+    assert run_batch(str(prog)) == 0 # the cache is opt-in
+    assert not (tmp_path / "cache").exists()
+    assert run_batch(str(prog), cache=True) == 0
+    assert run_batch(str(prog), cache=True) == 0
+    assert len(os.listdir(tmp_path / "cache")) == 1
+    assert capsys.readouterr().out == "5\n" * 3
@@ -31,4 +31,51 @@ def test_idiv_and_mod():
 def test_stack_underflow():
     # calling add with too few operands raises
     with pytest.raises(core.StackUnderflow):
-        run(["1", "add"])
\ No newline at end of file
+        run(["1", "add"])
+
+def test_every_operator_has_a_signature():
+    from ps_interpreter.operations import operations, signatures
+    assert set(signatures) == set(operations)
+
+def test_generated_operators_check_their_signature():
+    with pytest.raises(core.TypeMismatch):
+        run(["9.5", "2", "idiv"])
+    assert core.op_stack == []
+    with pytest.raises(ValueError):
+        run(["9", "0", "mod"])
+
+def test_numeric_arrays_work_element_wise():
+    run(["[1 2 3]", "dup", "mul", "1", "add"])
+    arr = core.op_stack.pop()
+    assert isinstance(arr, core.NumericArray) and list(arr) == [2, 5, 10]
+    run(["[1 2 3]", "[0.5 0.5 0.5]", "sub", "2", "div"])
+    assert list(core.op_stack.pop()) == [0.25, 0.75, 1.25]
+    run(["[4 1 9]", "dup", "sum", "exch", "dup", "min", "exch", "max"])
+    assert core.op_stack == [14, 1, 9]
+
+def test_numeric_arrays_keep_array_operators():
+    run(["[10 20 30 40]", "dup", "2", "get", "exch", "dup", "length", "exch",
+         "1", "[7 8]", "putinterval", "1", "2", "getinterval"])
+    assert core.op_stack[:2] == [30, 4] and list(core.op_stack[2]) == [7, 8]
+    core.op_stack.clear()
+
+def test_array_intervals_are_numeric_arrays():
+    from ps_interpreter.interpreter import Interpreter
+    import io
+    out = io.StringIO()
+    interp = Interpreter(output=out)
+    interp.run(["/s [1 2 3] 0 2 getinterval def s 2 mul = s 1 add = s sum = "
+                "[0 0 0] 1 s putinterval ="])
+    assert out.getvalue() == "[2 4]\n[2 3]\n3\n[0 1 2]\n"
+
+def test_arrays_keep_integers_and_reals_and_take_any_element():
+    from ps_interpreter.interpreter import Interpreter
+    interp = Interpreter()
+    interp.run(["[1 2.5] 0 get [3 0.5] 0 get { 7 } repeat [4 0.5] 0 get 3 idiv"])
+    assert interp.op_stack == [1, 7, 7, 7, 1] and type(interp.op_stack[0]) is int
+    interp.op_stack.clear()
+    interp.run(["/a [1 2 3] def a 0 [0.5] putinterval pop a 2 [(x)] putinterval pop "
+                "a 0 get a 1 get a 2 get a [0.5 0.5] 0 [1] putinterval 0 get"])
+    assert interp.op_stack[:3] == [0.5, 2, "x"] and type(interp.op_stack[1]) is int
+    assert type(interp.op_stack[2]) is core.PSString
+    assert interp.op_stack[4] == 1 and type(interp.op_stack[4]) is int
@@ -0,0 +1,175 @@
+import io
+import pytest
+from ps_interpreter.core import Name, StackOverflow, BudgetExceeded
+from ps_interpreter.interpreter import Interpreter
+
+def test_interpreters_do_not_share_state():
+    a = Interpreter()
+    b = Interpreter()
+    a.run(["/x 1 def /add { pop pop 0 } def 1 2 add"])
+    b.run(["/x 2 def 1 2 add"])
+    assert a.op_stack == [0]
+    assert b.op_stack == [3]
+    x = Name.of("x")
+    assert a.dict_stack[1][x] == 1 and b.dict_stack[1][x] == 2
+
+def test_interpreter_output_and_scoping_mode():
+    out = io.StringIO()
+    interp = Interpreter(lexical=True, output=out)
+    interp.run(["/x 1 def /f { x } def /x 2 def f ="])
+    assert out.getvalue() == "1\n"
+
+def test_reset_restores_operators():
+    interp = Interpreter()
+    interp.run(["/add 5 def 1"])
+    interp.reset()
+    interp.run(["1 2 add"])
+    assert interp.op_stack == [3]
+
+def test_length_operator():
+    interp = Interpreter()
+    interp.run(["(abc) length [1 2] length 3 dict length"])
+    assert interp.op_stack == [3, 2, 0]
+
+def test_lexical_capture_shares_dicts_until_written():
+    interp = Interpreter(lexical=True)
+    interp.run(["/x 1 def { x } /f exch def"])
+    block = interp.dict_stack[1][Name.of("f")]
+    userdict = block.env[1]
+    interp.run(["/x 2 def /g { /x 5 def x } def f g x"])
+    assert interp.op_stack == [1, 5, 2]
+    assert userdict[Name.of("x")] == 1 and Name.of("g") not in userdict # the snapshot never changed
+
+def test_lexical_capture_keeps_begun_dicts_identity():
+    interp = Interpreter(lexical=True)
+    interp.run(["/d 5 dict def d begin /a 1 def { a } end /f exch def"])
+    interp.run(["d begin /a 9 def /b 2 def end d length f"])
+    assert interp.op_stack == [2, 1]
+
+def test_name_cache_hits_and_invalidation():
+    interp = Interpreter()
+    interp.run(["/x 1 def x x"])
+    assert interp.cache_misses == 2 and interp.cache_hits == 1 # def, x, then x again
+    interp.run(["/x 2 def x 3 dict begin x /x 4 def x end x"])
+    assert interp.op_stack == [1, 1, 2, 2, 4, 2]
+
+def test_lexical_block_cache_survives_calls_but_not_local_defs():
+    interp = Interpreter(lexical=True)
+    interp.run(["/x 1 def /f { x } def /g { /x 7 def x } def f f g g x"])
+    assert interp.op_stack == [1, 1, 7, 7, 1]
+    f = interp.dict_stack[1][Name.of("f")]
+    assert f.name_cache == {Name.of("x"): 1}
+    assert interp.dict_stack[1][Name.of("g")].name_cache == {}
+
+def test_stack_limit_and_peak_depth():
+    interp = Interpreter(max_stack=50)
+    interp.run(["1 2 3 pop pop"])
+    assert interp.peak_depth == 3 and interp.stack_depth == 1
+    with pytest.raises(StackOverflow):
+        interp.run(["1 100 { dup } repeat"])
+    interp.reset()
+    with pytest.raises(StackOverflow):
+        interp.run(["1 2 3 10 { count copy } repeat"])
+    assert interp.stack_depth <= 50
+    interp.reset()
+    interp.run(["1 2 0 copy"])
+    assert interp.op_stack == [1, 2]
+
+def test_unrolled_loops_stop_at_the_stack_limit():
+    for source in ["1 1 1000 {} for", "1000 { 1 } repeat", "1 1 1000 { dup } for",
+                   "/f { 1 1 1000 {} for } bind def f"]:
+        interp = Interpreter(max_stack=10)
+        with pytest.raises(StackOverflow):
+            interp.run([source])
+        assert interp.stack_depth <= 12 # at most one iteration past the limit, as for any call
+
+def test_for_with_an_infinite_limit():
+    interp = Interpreter(max_instructions=20000)
+    with pytest.raises(BudgetExceeded):
+        interp.run(["0 1 1e400 { pop } for"])
+    interp = Interpreter()
+    interp.run(["0 1 1e400 1e400 sub { pop } for 1"]) # a limit that is not a number: no iterations
+    assert interp.op_stack == [1]
+
+def test_deep_recursion_runs_on_the_execution_stack():
+    interp = Interpreter()
+    interp.run(["/down { dup 0 gt { 1 sub down } if } def 20000 down"])
+    assert interp.op_stack == [0] and interp.exec_stack == []
+    interp = Interpreter(lexical=True)
+    interp.run(["5000 { exch dup 0 gt { 1 sub exch dup true exch if } { pop pop } ifelse } dup true exch if"])
+    assert interp.op_stack == [] and len(interp.dict_stack) == 2
+    interp = Interpreter(max_depth=500)
+    with pytest.raises(StackOverflow):
+        interp.run(["/f { f } def f"])
+    assert interp.exec_stack == []
+
+def test_fused_pairs_fall_back_on_the_execution_stack():
+    # `dup mul` is fused; with mul redefined, each fallback is a frame, not a Python call
+    source = "/mul { pop dup 0 gt { 1 sub dup mul } if } def 5000 dup mul"
+    interp = Interpreter()
+    interp.run([source])
+    assert interp.op_stack == [0] and interp.exec_stack == []
+    interp = Interpreter(max_depth=500)
+    with pytest.raises(StackOverflow):
+        interp.run([source])
+    assert interp.exec_stack == []
+
+def test_names_are_interned_and_distinct_from_strings():
+    from ps_interpreter.core import TypeMismatch
+    out = io.StringIO()
+    interp = Interpreter(output=out)
+    interp.run(["/x 1 def /x /x eq /x = /x =="])
+    assert interp.op_stack == [True] and out.getvalue() == "x\n/x\n"
+    assert Name.of("x", executable=False).key is Name.of("x") is next(iter(interp.dict_stack[1]))
+    with pytest.raises(TypeMismatch):
+        interp.run(["(y) 1 def"])
+
+def test_names_equal_strings_of_the_same_text():
+    interp = Interpreter()
+    interp.run(["/a (a) eq (a) /a eq /a (a) ne /a (b) eq /a /b eq"])
+    assert interp.op_stack == [True, True, False, False, False]
+
+def test_array_literals_hold_names_strings_and_procedures():
+    out = io.StringIO()
+    interp = Interpreter(output=out)
+    interp.run(["[/a] 0 get 5 def a [(ab)] 0 get length [(ab)] 0 get print [(x)] 0 get =="])
+    assert out.getvalue() == "ab(x)\n" and interp.op_stack == [5, 2]
+    interp.op_stack.clear()
+    interp.run(["[[1 /b] { 2 }] dup 0 get 1 get exch 1 get 0 3 [1 add] repeat"])
+    assert interp.op_stack[0] is Name.of("b", executable=False)
+    assert interp.op_stack[1].tokens == ["2"] and interp.op_stack[2] == 3
+    interp.op_stack.clear()
+    # the strings inside an array literal are copied with it
+    interp.run(["/f { [(aaa)] } def f 0 get 0 (b) putinterval f 0 get"])
+    assert interp.op_stack == ["baa", "aaa"]
+
+def test_unused_names_leave_the_intern_tables():
+    import gc
+    name = Name.of("only_here", executable=False)
+    assert Name.of("only_here") is name.key and Name.of("only_here", executable=False) is name
+    del name
+    gc.collect()
+    assert "only_here" not in Name._literal and "only_here" not in Name._executable
+
+def test_bind_replaces_operator_names_in_nested_procedures():
+    from ps_interpreter.parser import NAME, OPERATOR, PROC, FUSED
+    interp = Interpreter()
+    interp.run(["/inc { 1 add } def /f { inc dup mul exch 2 sub 2 { 3 mul } repeat } bind def"])
+    f = interp.dict_stack[1][Name.of("f")]
+    opcodes = [op for op, _ in f.instructions]
+    assert opcodes[0] == NAME # inc is a procedure, not an operator
+    assert OPERATOR in opcodes and FUSED in opcodes
+    inner = next(operand for op, operand in f.instructions if op == PROC)[1]
+    assert inner[0][0] == FUSED and inner[0][1].fallback[1][0] == OPERATOR
+    # redefining operators no longer affects the bound body, only unbound code such as inc
+    interp.run(["/add { pop pop 0 } def /mul { pop pop 0 } def 1 4 f 1 1 add"])
+    assert interp.op_stack == [0, -9, 0]
+
+def test_autobind_binds_procedures_as_they_are_defined():
+    from ps_interpreter.parser import OPERATOR
+    interp = Interpreter(autobind=True)
+    interp.run(["/x 5 def /g { x sq } def /sq { dup mul } def 3 sq g"])
+    assert interp.op_stack == [9, 25] # g was bound before sq existed, and still finds it
+    assert [op for op, _ in interp.dict_stack[1][Name.of("g")].instructions if op == OPERATOR] == []
+    (opcode, fused), = interp.dict_stack[1][Name.of("sq")].instructions
+    assert fused.fallback[0][0] == fused.fallback[1][0] == OPERATOR
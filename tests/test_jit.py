@@ -0,0 +1,66 @@
+import io
+import pytest
+from ps_interpreter.core import Name
+from ps_interpreter.interpreter import Interpreter
+from ps_interpreter.jit import JitInterpreter
+
+def both(source):
+    # runs source on the JIT and on the plain interpreter; returns the JIT and the two stacks
+    jit, plain = JitInterpreter(), Interpreter()
+    jit.jit_threshold = 3
+    for interp in (jit, plain):
+        interp.run([source])
+    return jit, jit.op_stack, plain.op_stack
+
+def block(interp, name):
+    return interp.dict_stack[1][Name.of(name)]
+
+def test_hot_procedures_are_compiled_with_the_same_results():
+    jit, stack, expected = both("/k 3 def /f { dup mul exch k idiv add 2 sqrt gt } def "
+                                "1 1 5 { 10 exch f } for [1 2] dup 4 { 2 mul } repeat")
+    assert stack == expected
+    assert block(jit, "f").native and "append" not in block(jit, "f").native.source # stack work is on locals
+
+def test_loops_compile_their_body_before_running():
+    jit, stack, expected = both("0 1 1 100 { dup mul add } for")
+    assert stack == expected == [sum(i * i for i in range(1, 101))]
+
+def test_loops_that_never_run_leave_their_body_cold():
+    jit, stack, expected = both("{ 1 add } dup /f exch def dup 0 exch repeat -5 exch repeat 7")
+    assert block(jit, "f").calls == 0 and block(jit, "f").native is None
+    assert stack == expected
+
+def test_redefinitions_fall_back_to_the_interpreter():
+    jit, stack, expected = both("/x 2 def /f { x mul } def 1 1 3 { f } for "
+                                "/x { 10 } def 5 f /mul { add } def 5 f /f { 0 } def f")
+    assert stack == expected == [2, 4, 6, 50, 15, 0]
+
+def test_failures_leave_the_same_stack_and_error():
+    for source in ("/f { 0 div } def 1 1 3 { f } for 7 f", "/f { exch mod } def 3 1 3 { f } for 9 1.5 f"):
+        jit, plain = JitInterpreter(), Interpreter()
+        jit.jit_threshold = 2
+        errors = []
+        for interp in (jit, plain):
+            with pytest.raises(Exception) as info:
+                interp.run([source])
+            errors.append((type(info.value), str(info.value), interp.op_stack))
+        assert errors[0] == errors[1]
+
+def test_bailing_out_in_deep_recursion_uses_the_execution_stack():
+    # f is compiled while x is a number; once x is a procedure that calls f, every call bails
+    jit, stack, expected = both("/x 1 def /f { x } def 1 1 5 { pop f pop } for "
+                                "/x { dup 0 gt { 1 sub f } if } def 5000 f")
+    assert block(jit, "f").native
+    assert stack == expected == [0] and jit.exec_stack == []
+
+def test_bodies_with_side_effects_stay_interpreted():
+    jit, stack, expected = both("/f { 1 add dup 2 gt { 1 sub } if } def 0 1 1 5 { pop f } for")
+    assert stack == expected and block(jit, "f").native is False
+
+def test_bind_drops_the_compiled_body():
+    from ps_interpreter.operations import bind
+    jit, stack, expected = both("/h { 1 add } def 0 1 1 5 { pop h } for")
+    h = block(jit, "h")
+    assert h.native
+    bind(jit, h)
+    assert h.native is None and h.calls == 0
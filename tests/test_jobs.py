@@ -0,0 +1,27 @@
+from ps_interpreter.jobs import load_jobs, run_jobs
+
+def test_run_jobs_in_input_order(tmp_path):
+    (tmp_path / "a.ps").write_text("1 2 add =")
+    (tmp_path / "b.ps").write_text("(hi) print 1 add")
+    (tmp_path / "c.ps").write_text("/sq { dup mul } def 3 sq")
+    results = run_jobs(load_jobs(str(tmp_path)), workers=2)
+    assert [r.status for r in results] == ["ok", "error", "ok"]
+    assert results[0].output == "3\n"
+    assert results[1].output == "hi" and results[1].stack == ["1"]
+    assert results[2].stack == ["9"]
+
+def test_manifest_and_timeout(tmp_path):
+    (tmp_path / "slow.ps").write_text("0 1 1 100000000 { add } for")
+    (tmp_path / "fast.ps").write_text("(done) =")
+    manifest = tmp_path / "jobs.txt"
+    manifest.write_text("# nightly\nslow.ps\n\nfast.ps\n")
+    results = run_jobs(load_jobs(str(manifest)), workers=1, timeout=0.2)
+    assert [r.status for r in results] == ["timeout", "ok"]
+    assert results[1].output == "done\n"
+
+def test_stack_limit_per_job(tmp_path):
+    (tmp_path / "deep.ps").write_text("1 1 100 { } for")
+    (tmp_path / "flat.ps").write_text("/sq { dup mul } def 3 sq")
+    results = run_jobs(load_jobs(str(tmp_path)), workers=1, max_stack=10)
+    assert results[0].status == "error" and results[0].error.startswith("stackoverflow")
+    assert results[1].status == "ok" and results[1].peak_stack == 2
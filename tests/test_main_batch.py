@@ -0,0 +1,39 @@
+from ps_interpreter.__main__ import run_batch
+
+def test_batch_runs_file(tmp_path, capsys):
+    prog = tmp_path / "prog.ps"
+    prog.write_text("/sq { dup mul }\ndef (sq: ) print\n4 sq =\nquit\n99 =\n")
+    assert run_batch(str(prog)) == 0
+    assert capsys.readouterr().out == "sq: 16\n"
+
+def test_batch_stops_on_first_error(tmp_path, capsys):
+    prog = tmp_path / "bad.ps"
+    prog.write_text("1 = 1 add 2 =")
+    assert run_batch(str(prog)) == 1
+    assert capsys.readouterr().out == "1\n"
+
+def test_plain_invocation_skips_argparse_with_the_same_defaults():
+    from ps_interpreter.__main__ import parse_args
+    fast = parse_args(["prog.ps"])
+    full = parse_args(["prog.ps", "--lexical"])
+    full.lexical = False
+    assert vars(fast) == vars(full)
+
+def test_profile_flag_comes_before_the_file():
+    from ps_interpreter.__main__ import parse_args
+    args = parse_args(["--profile", "prog.ps"])
+    assert args.file == "prog.ps" and args.profile == "table"
+    args = parse_args(["--profile-format", "json", "prog.ps"])
+    assert args.file == "prog.ps" and args.profile == "json"
+    assert parse_args(["--lexical", "prog.ps"]).profile is None
+
+def test_startup_imports_neither_logging_nor_argparse(tmp_path):
+    import sys, subprocess
+    code = ("import sys, runpy; sys.argv = ['ps', sys.argv[1]]\n"
+            "try: runpy.run_module('ps_interpreter', run_name='__main__')\n"
+            "except SystemExit: pass\n"
+            "print(sorted(m for m in ('logging', 'argparse') if m in sys.modules))")
+    prog = tmp_path / "p.ps"
+    prog.write_text("1 2 add =")
+    out = subprocess.run([sys.executable, "-c", code, str(prog)], capture_output=True, text=True).stdout
+    assert out == "3\n[]\n"
@@ -0,0 +1,49 @@
+import ps_interpreter.core as core
+from ps_interpreter.core import Name, NumericArray
+from ps_interpreter.parser import process_input, compile_tokens, PUSH, NAME, ARRAY, FUSED
+
+def run(tokens):
+    for t in tokens:
+        process_input(t)
+
+def test_compile_instruction_kinds():
+    instructions = compile_tokens(["(hi)", "true", "3", "/x", "[1 2]", "add"])
+    assert instructions == [
+        (ARRAY, "hi"),
+        (PUSH, True),
+        (PUSH, 3),
+        (PUSH, Name.of("x", executable=False)),
+        (ARRAY, NumericArray.of([1, 2])),
+        (NAME, Name.of("add")),
+    ]
+
+def test_codeblock_is_compiled_once():
+    process_input("{ 1 2 add }")
+    cb = core.op_stack.pop()
+    assert cb.instructions[0] == (PUSH, 1)
+    opcode, fused = cb.instructions[1]
+    assert opcode == FUSED and fused.fallback == ((PUSH, 2), (NAME, Name.of("add")))
+
+def test_repeat_and_for_run_code_blocks():
+    run(["0", "5", "{ 1 add }", "repeat"])
+    assert core.op_stack.pop() == 5
+    run(["0", "1", "1", "4", "{ add }", "for"])
+    assert core.op_stack.pop() == 10
+
+def test_named_procedure_sees_later_definitions():
+    run(["/inc", "{ step add }", "def", "/step", "2", "def", "1", "inc"])
+    assert core.op_stack.pop() == 3
+
+def test_superinstructions_fuse_common_pairs():
+    instructions = compile_tokens(["dup", "mul", "1", "add", "exch", "sub", "2", "exch"])
+    assert [op for op, _ in instructions] == [FUSED, FUSED, FUSED, PUSH, NAME]
+    run(["7", "/f", "{ dup mul 1 add 100 exch sub }", "def", "f"])
+    assert core.op_stack.pop() == 50
+    run(["/g", "{ exch sub }", "def", "1", "5", "g"])
+    assert core.op_stack.pop() == 4
+
+def test_superinstructions_respect_redefined_operators():
+    run(["/f", "{ 1 add }", "def", "5", "f"])
+    assert core.op_stack.pop() == 6
+    run(["/add", "{ mul }", "def", "5", "f"])
+    assert core.op_stack.pop() == 5
@@ -18,10 +18,35 @@ def test_array_and_codeblock():
     core.op_stack.clear()
     process_input("[1 2 bar]")
     arr = core.op_stack.pop()
-    assert arr == ["1", "2", "bar"]
+    assert arr == [1, 2, core.Name.of("bar")]
 
     process_input("{ 1 2 add }")
     cb = core.op_stack.pop()
     from ps_interpreter.core import CodeBlock
     assert isinstance(cb, CodeBlock)
-    assert cb.tokens == ["1", "2", "add"]
\ No newline at end of file
+    assert cb.tokens == ["1", "2", "add"]
+
+def test_classify_numbers_and_names():
+    from ps_interpreter.parser import classify, process_number, process_name_constant
+    for tok in ["1", "-7", "+3", "3.5", ".5", "1e3", "2.5E-2"]:
+        assert classify(tok) is process_number
+    for tok in ["add", "inf", "nan", "1_000", "-", "(unclosed"]:
+        assert classify(tok) is None
+    assert classify("/x") is process_name_constant
+
+def test_tokenize_nested_procedures_and_strings():
+    toks = tokenize("{ { 1 } if } (a (b) c) /f{x}def [1 [2] 3]")
+    assert toks == ["{ { 1 } if }", "(a (b) c)", "/f", "{x}", "def", "[1 [2] 3]"]
+
+def test_iter_tokens_across_chunk_boundaries():
+    from ps_interpreter.core import iter_tokens
+    src = "/sq { dup mul % square it\n } def (x (y)) 12 sq"
+    expected = ["/sq", "{ dup mul \n }", "def", "(x (y))", "12", "sq"]
+    for size in (1, 2, 5):
+        chunks = (src[i:i + size] for i in range(0, len(src), size))
+        assert list(iter_tokens(chunks)) == expected
+
+def test_nested_procedure_runs():
+    for tok in tokenize("/fact { dup 1 gt { dup 1 sub fact mul } if } def 5 fact"):
+        process_input(tok)
+    assert core.op_stack.pop() == 120
@@ -0,0 +1,36 @@
+import pytest
+from ps_interpreter.core import Name
+from ps_interpreter.interpreter import Interpreter
+from ps_interpreter.parser import PUSH, NAME, ARRAY, PROC, FUSED, OPERATOR
+
+def body(interp, name):
+    return interp.dict_stack[1][Name.of(name)].instructions
+
+def test_folds_literals_and_drops_no_ops():
+    interp = Interpreter(opt_level=2)
+    interp.run(["/x 4 def /f { 2 3 mul 1 add x exch exch dup pop 9 pop 2 sqrt } def f"])
+    assert body(interp, "f") == [(PUSH, 7), (NAME, Name.of("x")), (PUSH, 2 ** 0.5)]
+    assert interp.op_stack == [7, 4, 2 ** 0.5]
+
+def test_inlines_literal_conditions_in_dynamic_mode_only():
+    source = "/f { 1 2 lt { (yes) } { (no) } ifelse true { 5 } if false { 6 } if 3 4 add } def f"
+    interp = Interpreter(opt_level=2)
+    interp.run([source])
+    assert body(interp, "f") == [(ARRAY, "yes"), (PUSH, 5), (PUSH, 7)]
+    lexical = Interpreter(lexical=True, opt_level=2)
+    lexical.run([source])
+    assert [op for op, _ in body(lexical, "f")].count(PROC) == 4 # branches keep their environment
+    assert interp.op_stack == lexical.op_stack == ["yes", 5, 7]
+
+def test_failing_and_redefined_operators_are_not_folded():
+    interp = Interpreter(opt_level=2)
+    interp.run(["/add { pop pop 0 } def /f { 2 3 add 1 0 div } def"])
+    assert [op for op, _ in body(interp, "f")] == [PUSH, FUSED, PUSH, PUSH, OPERATOR]
+    with pytest.raises(ValueError):
+        interp.run(["f"])
+    assert interp.op_stack == [0] # as unoptimized: div raised at run time
+
+def test_level_one_optimizes_only_what_is_bound():
+    interp = Interpreter(opt_level=1)
+    interp.run(["/f { 2 3 mul } def /g { 2 3 mul } bind def"])
+    assert len(body(interp, "f")) == 2 and body(interp, "g") == [(PUSH, 6)]
@@ -0,0 +1,55 @@
+import json
+from ps_interpreter.core import Name
+from ps_interpreter.interpreter import Interpreter
+from ps_interpreter.operations import operations
+from ps_interpreter.profiler import Profiler
+
+def test_profiler_counts_operators_and_named_procedures():
+    interp = Interpreter()
+    profiler = Profiler(interp)
+    profiler.enable()
+    interp.run(["/sq { dup mul } def 1 1 3 { sq pop } for"])
+    stats = {(s.kind, s.name): s for s in profiler.results()}
+    assert stats[("procedure", "sq")].calls == 3
+    assert stats[("operator", "mul")].calls == 3
+    assert stats[("operator", "for")].max_stack == 4
+    assert stats[("operator", "for")].self_time <= stats[("operator", "for")].total
+    assert json.loads(profiler.report("json"))[0]["calls"] >= 1
+
+def test_disable_restores_original_operators():
+    interp = Interpreter()
+    profiler = Profiler(interp)
+    profiler.enable()
+    add = Name.of("add")
+    assert interp.dict_stack[0][add] is not operations["add"]
+    assert Interpreter().dict_stack[0][add] is operations["add"] # the shared systemdict is untouched
+    profiler.disable()
+    assert interp.dict_stack[0][add] is operations["add"]
+    assert "push_code_block" not in vars(interp)
+
+def test_profiled_procedures_run_on_the_execution_stack():
+    interp = Interpreter()
+    profiler = Profiler(interp)
+    profiler.enable()
+    interp.run(["/down { dup 0 gt { 1 sub down } if } def 5000 down"])
+    assert interp.op_stack == [0] and interp.exec_stack == []
+    stats = {(s.kind, s.name): s for s in profiler.results()}
+    assert stats[("procedure", "down")].calls == 5001
+    assert stats[("operator", "sub")].calls == 5000 # `1 sub` is fused, and counted as its operator
+    assert profiler._frames == []
+
+def test_procedures_bound_before_enable_count_their_operators():
+    from ps_interpreter.jit import JitInterpreter
+    jit = JitInterpreter()
+    jit.jit_threshold = 1
+    for interp in (Interpreter(opt_level=1), jit):
+        interp.run(["/sq { dup mul } bind def /norm { dup mul exch dup mul add sqrt } bind def 2 sq pop"])
+        assert interp is not jit or interp.dict_stack[1][Name.of("sq")].native
+        profiler = Profiler(interp)
+        profiler.enable()
+        interp.run(["1 1 10 { sq pop 3 4 norm pop } for"])
+        stats = {(s.kind, s.name): s for s in profiler.results()}
+        assert stats[("operator", "mul")].calls == 30 and stats[("operator", "sqrt")].calls == 10
+        assert stats[("procedure", "norm")].calls == 10
+        profiler.disable()
+        assert "frame" not in vars(interp)
@@ -0,0 +1,63 @@
+import json
+import asyncio
+from ps_interpreter.server import Server
+
+async def _exchange(address, requests):
+    reader, writer = await asyncio.open_connection(*address[:2])
+    for request in requests:
+        writer.write(json.dumps(request).encode() + b"\n")
+    await writer.drain()
+    responses = [json.loads(await reader.readline()) for _ in requests]
+    writer.close()
+    return responses
+
+def test_server_runs_programs_and_counts_them():
+    async def scenario():
+        server = Server(workers=1, timeout=0.5)
+        address = await server.start()
+        try:
+            ok, bad, slow = await _exchange(address, [
+                {"id": 1, "source": "/sq { dup mul } def 4 sq dup ="},
+                {"id": 2, "source": "1 add"},
+                {"id": 3, "source": "0 1 1 100000000 { add } for"},
+            ])
+            stats, = await _exchange(address, [{"stats": True}])
+        finally:
+            await server.close()
+        return ok, bad, slow, stats
+    ok, bad, slow, stats = asyncio.run(scenario())
+    assert ok["id"] == 1 and ok["status"] == "ok" and ok["output"] == "16\n" and ok["stack"] == ["16"]
+    assert bad["status"] == "error"
+    assert slow["status"] == "timeout"
+    assert stats["completed"] == 3 and stats["errors"] == 1 and stats["timeouts"] == 1
+
+def test_server_rejects_requests_beyond_max_pending():
+    async def scenario():
+        server = Server(workers=1, timeout=0.5, max_pending=1)
+        await server.start()
+        try:
+            return await asyncio.gather(server.run_program("0 1 1 100000 { add } for"),
+                                        server.run_program("1"))
+        finally:
+            await server.close()
+    first, second = asyncio.run(scenario())
+    assert first.status == "ok" and second.status == "busy"
+
+def test_server_answers_bad_requests_and_keeps_the_connection():
+    async def scenario():
+        server = Server(workers=1, timeout=0.5, max_request=1024)
+        address = await server.start()
+        try:
+            return await _exchange(address, [
+                {"id": 1, "source": "(" + "x" * 5000 + ")"},
+                {"id": 2, "source": "1 2 add", "timeout": "x"},
+                {"id": 3, "source": ["1"]},
+                {"id": 4, "source": "1 2 add", "timeout": 0.25},
+            ])
+        finally:
+            await server.close()
+    oversize, timeout, source, ok = asyncio.run(scenario())
+    assert oversize["status"] == "error" and "1024 bytes" in oversize["error"]
+    assert timeout == {"id": 2, "status": "error", "error": '"timeout" must be a positive number of seconds.'}
+    assert source["id"] == 3 and source["status"] == "error"
+    assert ok["id"] == 4 and ok["stack"] == ["3"]
@@ -0,0 +1,53 @@
+import io
+import pytest
+from ps_interpreter.core import BudgetExceeded
+from ps_interpreter.interpreter import Interpreter
+
+def test_instruction_and_time_budgets():
+    interp = Interpreter(max_instructions=5000)
+    interp.run(["0 100 { 1 add } repeat"])
+    assert interp.op_stack == [100]
+    with pytest.raises(BudgetExceeded):
+        interp.run(["0 1000000 { 1 add } repeat"])
+    interp = Interpreter(max_seconds=0.05)
+    with pytest.raises(BudgetExceeded):
+        interp.run(["1 1 1000000000 { pop } for"])
+
+def test_execution_runs_in_resumable_slices():
+    interp = Interpreter(output=io.StringIO())
+    execution = interp.start(["0 1 1 20000 { add } for ="])
+    slices = 1
+    while not execution.resume(instructions=5000):
+        slices += 1
+    assert slices > 3
+    assert interp.output.getvalue() == "200010000\n"
+
+def test_execution_errors_and_cancel():
+    execution = Interpreter().start(["1 0 div"])
+    with pytest.raises(ValueError):
+        execution.resume()
+    assert execution.done
+    execution = Interpreter().start(["0 1 1 1000000 { add } for"])
+    assert not execution.resume(instructions=2000)
+    execution.cancel()
+    assert execution.done and execution.error is None
+
+def test_slices_run_on_the_execution_stack_without_threads():
+    import threading
+    threads = threading.active_count()
+    interp = Interpreter()
+    execution = interp.start(["/down { dup 0 gt { 1 sub down } if } def 20000 down"])
+    assert not execution.resume(instructions=2000)
+    assert threading.active_count() == threads and interp.exec_stack # paused mid-recursion
+    interp.op_stack.append(99) # the interpreter is free between slices
+    interp.op_stack.pop()
+    while not execution.resume(instructions=2000):
+        pass
+    assert interp.op_stack == [0] and interp.exec_stack == []
+
+def test_compiled_loops_count_against_the_budget():
+    from ps_interpreter.jit import JitInterpreter
+    interp = JitInterpreter(max_instructions=250000)
+    interp.jit_threshold = 1
+    with pytest.raises(BudgetExceeded): # 100000 iterations of the value, the fused pair and add
+        interp.run(["0 1 1 100000 { dup mul add } for"])
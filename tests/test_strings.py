@@ -0,0 +1,17 @@
+import io
+from ps_interpreter.core import Name
+from ps_interpreter.interpreter import Interpreter
+
+def test_strings_are_edited_in_place_and_intervals_share_storage():
+    out = io.StringIO()
+    interp = Interpreter(output=out)
+    interp.run(["/buf 6 string def /s (hello world) def "
+                "/w s 6 5 getinterval def w 0 (W) putinterval pop "
+                "buf 0 (ab) putinterval buf 4 (yz) putinterval pop "
+                "s print s length = w == s 6 get = (abc) (abc) eq = (abc) (abd) lt ="])
+    assert out.getvalue() == "hello World11\n(World)\n87\nTrue\nTrue\n"
+    buf = interp.resolve(Name.of("buf"))
+    assert bytes(buf.data) == b"ab\0\0yz"
+    # literals are copied when pushed, so editing one never changes the program
+    interp.run(["/f { (aaa) } def f 0 (b) putinterval f"])
+    assert interp.op_stack[-2:] == ["baa", "aaa"]
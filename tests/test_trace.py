@@ -0,0 +1,17 @@
+import logging
+from ps_interpreter.trace import TracingInterpreter
+
+def test_tracing_interpreter_logs_each_instruction(caplog):
+    interp = TracingInterpreter()
+    with caplog.at_level(logging.DEBUG, logger="ps_interpreter.trace"):
+        interp.run(["/sq { dup mul } def 3 sq"])
+    lines = [r.getMessage().split()[0] for r in caplog.records]
+    assert lines == ["/sq", "{dup", "def", "3", "sq", "dup", "mul"]
+    assert interp.op_stack == [9]
+
+def test_trace_shows_array_literals(caplog):
+    interp = TracingInterpreter()
+    with caplog.at_level(logging.DEBUG, logger="ps_interpreter.trace"):
+        interp.run(["[1 foo (s) [2.5 true] /n] pop [1 2] pop"])
+    lines = [r.args[0] for r in caplog.records]
+    assert lines == ["[1 foo (s) [2.5 true] /n]", "pop", "[1 2]", "pop"]